@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""CPU cost of rendering a 100-product page: FastAPI response_model path vs FastJSONResponse.
+
+Run from backend/:  python -m benchmarks.serialization [--items 100] [--rounds 2000]
+"""
+import argparse
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.product import ProductResponse  # noqa: E402
+from services import fast_json  # noqa: E402
+from services.fast_json import FastJSONResponse  # noqa: E402
+
+
+def product_page(count: int) -> List[dict]:
+    """Localized product views shaped like the ones stored by ProductService."""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(ObjectId()),
+            "name": f"Cepillo de Dientes de Bambú {i}",
+            "description": "Cepillo biodegradable con cerdas de carbón activado y mango de bambú sostenible.",
+            "category": "cepillos-bambu",
+            "price": 8.99 + i,
+            "originalPrice": 12.99 + i,
+            "image": f"https://images.example.com/products/{i}.jpg",
+            "amazonLink": f"https://amazon.es/dp/ejemplo{i}",
+            "rating": 4.5,
+            "reviews": 200 + i,
+            "features": ["100% biodegradable", "Cerdas de carbón", "Mango ergonómico", "Sin plástico"],
+            "discount": 30.8,
+            "favoriteCount": i,
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="Products per page")
+    parser.add_argument("--rounds", type=int, default=2000, help="Renders per measurement")
+    args = parser.parse_args()
+
+    page = product_page(args.items)
+    adapter = TypeAdapter(List[ProductResponse])
+
+    def fastapi_path() -> bytes:
+        # What FastAPI does for response_model=List[ProductResponse]
+        validated = adapter.validate_python(page)
+        return JSONResponse(jsonable_encoder(validated)).body
+
+    def fast_path() -> bytes:
+        return FastJSONResponse(page).body
+
+    encoder = "orjson" if fast_json.orjson is not None else "json (orjson not installed)"
+    print(f"📦 {args.items} products per page, {args.rounds} renders, fast encoder: {encoder}")
+
+    results = {}
+    for name, render in [("response_model", fastapi_path), ("fast", fast_path)]:
+        best = min(timeit.repeat(render, number=args.rounds, repeat=5))
+        results[name] = best / args.rounds * 1e6
+        print(f"   {name:>15}: {results[name]:8.1f} µs/request, {len(render()):,} bytes")
+
+    saved = results["response_model"] - results["fast"]
+    print(f"\n🎉 Saves {saved:.1f} µs of CPU per request ({results['response_model'] / results['fast']:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Suggest index build time and per-lookup latency on a synthetic catalog.
+
+Run from backend/:  python -m benchmarks.suggest_index [--products 20000] [--lookups 300]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.suggest_index import SuggestIndex  # noqa: E402
+
+WORDS = ["bambu", "cepillo", "champu", "solido", "jabon", "natural", "kit", "viaje", "algodon", "organico"]
+PREFIXES = ["b", "cep", "champu so", "jab", "organico k", "zzz"]
+
+
+def synthetic_products(count: int):
+    for number in range(count):
+        words = [WORDS[(number + offset) % len(WORDS)] for offset in range(3)]
+        name = " ".join(words) + f" {number}"
+        yield {"_id": ObjectId(), "name": {"es": name, "en": name}, "reviews": number % 500, "is_active": True}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=20000, help="Products indexed")
+    parser.add_argument("--lookups", type=int, default=300, help="Suggestions timed")
+    args = parser.parse_args()
+
+    products = list(synthetic_products(args.products))
+    suggest_index = SuggestIndex()
+    indexes = suggest_index._new_indexes()
+
+    # What build() does once the documents are loaded
+    started = time.perf_counter()
+    for index in indexes.values():
+        index.defer_sorting()
+    for product in products:
+        suggest_index.index_product(product, indexes)
+    for index in indexes.values():
+        index.finish_sorting()
+    build_seconds = time.perf_counter() - started
+    print(f"📦 {args.products:,} products, {len(indexes)} languages")
+    print(f"   build: {build_seconds:.2f} s")
+
+    index = indexes["es"]
+    prefixes = [PREFIXES[position % len(PREFIXES)] for position in range(args.lookups)]
+    started = time.perf_counter()
+    for prefix in prefixes:
+        index.suggest(prefix, 8)
+    per_lookup = (time.perf_counter() - started) / len(prefixes)
+    print(f"   lookup: {per_lookup * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+from pathlib import Path
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Import services
+from services.database import db_service
+from services.product_service import product_service
+
+
+async def build_snapshot(path: str) -> bool:
+    """Publish the catalog snapshot file that every worker maps"""
+
+    if path:
+        os.environ["CATALOG_SNAPSHOT_FILE"] = path
+    if not product_service.snapshot_file:
+        print("❌ No snapshot file: pass a path or set CATALOG_SNAPSHOT_FILE")
+        return False
+
+    # Connect to database
+    await db_service.connect()
+
+    try:
+        count = await product_service.publish_snapshot_file()
+        size = os.path.getsize(product_service.snapshot_file)
+        print(f"🎉 Published {product_service.snapshot_file}: {count} products, {size} bytes")
+        return True
+    finally:
+        await db_service.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the shared catalog snapshot file and swap it in atomically"
+    )
+    parser.add_argument("path", nargs="?", help="Snapshot file; defaults to CATALOG_SNAPSHOT_FILE")
+    args = parser.parse_args()
+
+    built = asyncio.run(build_snapshot(args.path))
+    sys.exit(0 if built else 1)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import sys
+from dotenv import load_dotenv
+from pathlib import Path
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Import services
+from services.database import db_service
+from services.index_manager import index_manager
+
+
+async def manage_indexes(dry_run: bool, collections: list, replace_drifted: bool = False) -> bool:
+    """Reconcile the database indexes against models/indexes.py"""
+
+    # Connect to database
+    await db_service.connect()
+
+    try:
+        report = await index_manager.reconcile(
+            dry_run=dry_run,
+            collections=collections or None,
+            replace_drifted=replace_drifted
+        )
+
+        for spec in report.present:
+            print(f"✅ {spec.collection}.{spec.name}")
+        for spec in report.created:
+            print(f"🆕 {spec.collection}.{spec.name} created")
+        for spec in report.missing:
+            print(f"➕ {spec.collection}.{spec.name} would be created: {spec.keys}")
+        for spec, error in report.failed:
+            print(f"❌ {spec.collection}.{spec.name} failed: {error}")
+        for collection_name, name, reason in report.drift:
+            print(f"⚠️  {collection_name}.{name}: {reason}")
+
+        print(f"\n{'🔍 Dry run' if dry_run else '🎉 Done'}: {report.summary()}")
+        return report.clean
+    finally:
+        await db_service.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create missing indexes and report index drift")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument(
+        "--replace-drifted",
+        action="store_true",
+        help="Drop and rebuild indexes whose definition differs from the registry"
+    )
+    parser.add_argument("collections", nargs="*", help="Limit to these collections")
+    args = parser.parse_args()
+
+    clean = asyncio.run(manage_indexes(args.dry_run, args.collections, args.replace_drifted))
+    sys.exit(0 if clean else 1)
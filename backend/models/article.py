@@ -113,6 +113,7 @@ class ArticleSummary(BaseModel):
     tags: List[str]
     author: str
     publishedDate: datetime
+    score: Optional[float] = None  # Relevance, set on $text search results
 
     model_config = {
         "populate_by_name": True
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from bson import ObjectId
-from typing import Any
+from typing import Any, List
 
 
 class PyObjectId(ObjectId):
@@ -42,6 +42,16 @@ class FavoriteCreate(BaseModel):
     }
 
 
+class FavoriteBulkRequest(BaseModel):
+    user_id: str = Field(alias="userId")
+    add: List[str] = Field(default_factory=list)
+    remove: List[str] = Field(default_factory=list)
+
+    model_config = {
+        "populate_by_name": True
+    }
+
+
 class FavoriteResponse(BaseModel):
     id: str
     userId: str
@@ -0,0 +1,174 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Tuple
+
+
+class IndexSpec(BaseModel):
+    collection: str
+    name: str
+    keys: List[Tuple[str, Any]]
+    unique: bool = False
+    options: Dict[str, Any] = Field(default_factory=dict)
+
+    @property
+    def is_text(self) -> bool:
+        return any(direction == "text" for _, direction in self.keys)
+
+
+# Every index the API relies on. The reconciler in services/index_manager.py
+# creates whatever is missing and reports anything that has drifted from here.
+INDEXES: List[IndexSpec] = [
+    # Products: listing filters in keyset (_id) order
+    IndexSpec(
+        collection="products",
+        name="products_active_id",
+        keys=[("is_active", 1), ("_id", 1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_category_id",
+        keys=[("is_active", 1), ("category", 1), ("_id", 1)]
+    ),
+    # Products: the price, rating, review, discount and popularity sorts, with
+    # and without a category. Range filters on these fields ride along on the
+    # same scans.
+    IndexSpec(
+        collection="products",
+        name="products_active_price",
+        keys=[("is_active", 1), ("price", 1), ("_id", 1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_category_price",
+        keys=[("is_active", 1), ("category", 1), ("price", 1), ("_id", 1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_rating",
+        keys=[("is_active", 1), ("rating", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_category_rating",
+        keys=[("is_active", 1), ("category", 1), ("rating", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_reviews",
+        keys=[("is_active", 1), ("reviews", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_category_reviews",
+        keys=[("is_active", 1), ("category", 1), ("reviews", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_discount",
+        keys=[("is_active", 1), ("discount", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_category_discount",
+        keys=[("is_active", 1), ("category", 1), ("discount", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_popular",
+        keys=[("is_active", 1), ("favorite_count", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="products",
+        name="products_active_category_popular",
+        keys=[("is_active", 1), ("category", 1), ("favorite_count", -1), ("_id", -1)]
+    ),
+    # $text search runs over the per-language search_text copies. Each copy
+    # names its own analyzer in a "language" field, so Spanish text is stemmed
+    # as Spanish and English as English within one index.
+    IndexSpec(
+        collection="products",
+        name="products_text",
+        keys=[
+            ("search_text.es.name", "text"), ("search_text.es.description", "text"),
+            ("search_text.es.features", "text"), ("search_text.en.name", "text"),
+            ("search_text.en.description", "text"), ("search_text.en.features", "text")
+        ],
+        options={
+            "default_language": "none",
+            "language_override": "language",
+            "weights": {
+                "search_text.es.name": 10, "search_text.en.name": 10,
+                "search_text.es.features": 4, "search_text.en.features": 4,
+                "search_text.es.description": 1, "search_text.en.description": 1
+            }
+        }
+    ),
+
+    # Articles: slug lookups and the listing sort orders
+    IndexSpec(
+        collection="articles",
+        name="articles_slug_unique",
+        keys=[("slug", 1)],
+        unique=True
+    ),
+    IndexSpec(
+        collection="articles",
+        name="articles_published_date",
+        keys=[("is_published", 1), ("published_date", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="articles",
+        name="articles_published_category_date",
+        keys=[("is_published", 1), ("category", 1), ("published_date", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="articles",
+        name="articles_published_product_count",
+        keys=[("is_published", 1), ("product_count", -1), ("published_date", -1), ("_id", -1)]
+    ),
+    IndexSpec(
+        collection="articles",
+        name="articles_text",
+        keys=[
+            ("search_text.es.title", "text"), ("search_text.es.excerpt", "text"),
+            ("search_text.es.content", "text"), ("search_text.es.tags", "text"),
+            ("search_text.en.title", "text"), ("search_text.en.excerpt", "text"),
+            ("search_text.en.content", "text"), ("search_text.en.tags", "text")
+        ],
+        options={
+            "default_language": "none",
+            "language_override": "language",
+            "weights": {
+                "search_text.es.title": 10, "search_text.en.title": 10,
+                "search_text.es.tags": 5, "search_text.en.tags": 5,
+                "search_text.es.excerpt": 3, "search_text.en.excerpt": 3,
+                "search_text.es.content": 1, "search_text.en.content": 1
+            }
+        }
+    ),
+
+    # Categories
+    IndexSpec(
+        collection="categories",
+        name="categories_id_unique",
+        keys=[("category_id", 1)],
+        unique=True
+    ),
+    IndexSpec(
+        collection="categories",
+        name="categories_active",
+        keys=[("is_active", 1)]
+    ),
+
+    # Favorites: one row per (user, product), and per-user listings newest first
+    IndexSpec(
+        collection="favorites",
+        name="favorites_user_product_unique",
+        keys=[("user_id", 1), ("product_id", 1)],
+        unique=True
+    ),
+    IndexSpec(
+        collection="favorites",
+        name="favorites_user_created",
+        keys=[("user_id", 1), ("created_at", -1), ("_id", -1)]
+    ),
+]
@@ -97,10 +97,46 @@ class ProductResponse(BaseModel):
     rating: float
     reviews: int
     features: List[str]
+    discount: float = 0.0  # Percent off originalPrice
+    favoriteCount: int = 0
     isActive: bool
     createdAt: datetime
     updatedAt: datetime
+    score: Optional[float] = None  # Relevance, set on $text search results
 
     model_config = {
         "populate_by_name": True
-    }
\ No newline at end of file
+    }
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class FacetBucket(BaseModel):
+    min: float
+    max: Optional[float] = None  # Open-ended top bucket
+    count: int
+
+
+class ProductFacets(BaseModel):
+    categories: List[FacetCount]
+    price: List[FacetBucket]
+    rating: List[FacetBucket]
+
+
+class FacetedProductsResponse(BaseModel):
+    items: List[ProductResponse]
+    total: int
+    facets: ProductFacets
+
+
+class ProductBatchRequest(BaseModel):
+    ids: List[str]
+    language: str = "es"
+
+
+class ProductBatchResponse(BaseModel):
+    items: List[ProductResponse]
+    missing: List[str]  # Requested IDs that are unknown, malformed or inactive
@@ -11,6 +11,8 @@ load_dotenv(ROOT_DIR / '.env')
 
 # Import models and services
 from services.database import db_service
+from services.article_service import article_service
+from services.index_manager import index_manager
 
 
 async def populate_articles():
@@ -200,10 +202,15 @@ async def populate_articles():
         
         print("✅ Inserted articles")
         
-        # Create text indexes for search
-        await db_service.create_text_index("articles", ["title.es", "title.en", "content.es", "content.en", "tags"])
+        # Precompute per-language response documents and sort keys
+        await article_service.backfill_derived_fields()
         
-        print("✅ Created article search indexes")
+        print("✅ Built localized article views")
+        
+        # Create the registry indexes (see models/indexes.py)
+        report = await index_manager.reconcile(collections=["articles"])
+        
+        print(f"✅ Reconciled article indexes: {report.summary()}")
         
         print(f"\n🎉 Articles populated successfully!")
         print(f"   📝 Articles: {len(articles_data)}")
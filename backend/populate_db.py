@@ -12,6 +12,9 @@ load_dotenv(ROOT_DIR / '.env')
 from models.product import ProductCreate, TranslatedField
 from models.category import CategoryCreate
 from services.database import db_service
+from services.product_service import product_service
+from services.favorite_service import favorite_service
+from services.index_manager import index_manager
 
 
 async def populate_database():
@@ -214,10 +217,20 @@ async def populate_database():
         
         print("✅ Inserted products")
         
-        # Create text indexes for search
-        await db_service.create_text_index("products", ["name.es", "name.en", "description.es", "description.en"])
+        # Precompute per-language response documents and search text
+        await product_service.backfill_derived_fields()
         
-        print("✅ Created search indexes")
+        print("✅ Built localized product views")
+        
+        # Start every product's favorite counter at its real value (0 after a reset)
+        await favorite_service.reconcile_favorite_counts()
+        
+        print("✅ Initialized favorite counts")
+        
+        # Create the registry indexes (see models/indexes.py)
+        report = await index_manager.reconcile(collections=["products", "categories", "favorites"])
+        
+        print(f"✅ Reconciled indexes: {report.summary()}")
         
         print(f"\n🎉 Database populated successfully!")
         print(f"   📦 Categories: {len(categories_data)}")
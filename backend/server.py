@@ -1,40 +1,154 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import JSONResponse
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 import os
+import asyncio
 import logging
 from pathlib import Path
 from typing import List, Optional
+from urllib.parse import quote
 from contextlib import asynccontextmanager
 
 # Import models and services
-from models.product import ProductCreate, ProductUpdate, ProductResponse
+from models.product import (
+    ProductCreate, ProductUpdate, ProductResponse, FacetedProductsResponse, ProductBatchRequest, ProductBatchResponse
+)
 from models.category import CategoryCreate, CategoryResponse
-from models.favorite import FavoriteCreate, FavoriteResponse
+from models.favorite import FavoriteCreate, FavoriteBulkRequest, FavoriteResponse
 from models.article import ArticleCreate, ArticleResponse, ArticleSummary
-from services.database import db_service
-from services.product_service import product_service
+from services.database import db_service, OVERLOAD_ERRORS
+from services.product_service import product_service, RangeFilters
 from services.article_service import article_service
+from services.favorite_service import favorite_service
+from services.category_service import category_service
+from services.index_manager import index_manager
+from services.search_engine import search_engine
+from services.suggest_index import suggest_index
+from services.fuzzy_index import fuzzy_index
+from services.pagination import InvalidCursor, Page
+from services.config import env_bool, env_int
+from services.compression import CompressionMiddleware
+from services.fast_json import FastJSONResponse, fast_responses_enabled
+from services.single_flight import single_flight_stats
+from services.query_cache import query_cache
+from services.invalidation_bus import invalidation_bus
+from services.http_cache import (
+    ConditionalGetMiddleware, conditional_get, version_etag, http_date
+)
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 
+async def build_search_engine():
+    try:
+        await search_engine.build()
+    except Exception:
+        logging.warning("Search engine unavailable, searches fall back to Mongo")
+
+
+async def warm_suggest_index():
+    try:
+        await suggest_index.ensure_ready()
+    except Exception:
+        logging.warning("Suggest index warm-up failed, it will be built on first use")
+
+
+async def warm_fuzzy_index():
+    try:
+        await fuzzy_index.ensure_ready()
+    except Exception:
+        logging.warning("Fuzzy index warm-up failed, it will be built on first use")
+
+
+async def reconcile_favorite_counts_periodically(interval: int):
+    while True:
+        try:
+            fixed = await favorite_service.reconcile_favorite_counts()
+            if fixed:
+                logging.info(f"Corrected favorite counts on {fixed} products")
+        except Exception as e:
+            logging.error(f"Error reconciling favorite counts: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+async def reconcile_indexes():
+    try:
+        report = await index_manager.reconcile()
+        logging.info(f"Index reconciliation finished: {report.summary()}")
+    except Exception as e:
+        logging.error(f"Error reconciling indexes: {str(e)}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await db_service.connect()
     logging.info("Database connected successfully")
+    # Writes handled by other workers reach this worker's caches through the bus
+    invalidation_bus.on("products", product_service.apply_change)
+    invalidation_bus.on("product_counters", product_service.apply_counter_change)
+    invalidation_bus.on("articles", article_service.apply_change)
+    invalidation_bus.on("categories", category_service.apply_change)
+    await invalidation_bus.start()
+    startup_tasks = []
+    if env_bool("INDEX_RECONCILE_ON_STARTUP", default=True):
+        startup_tasks.append(asyncio.create_task(reconcile_indexes()))
+    if env_bool("SEARCH_ENGINE_ENABLED"):
+        startup_tasks.append(asyncio.create_task(build_search_engine()))
+    startup_tasks.append(asyncio.create_task(warm_suggest_index()))
+    startup_tasks.append(asyncio.create_task(warm_fuzzy_index()))
+    # Favorite writes keep the counters current; this only repairs drift. 0 disables it.
+    favorite_count_interval = env_int("FAVORITE_COUNT_RECONCILE_SECONDS", 3600)
+    if favorite_count_interval > 0:
+        startup_tasks.append(asyncio.create_task(reconcile_favorite_counts_periodically(favorite_count_interval)))
     yield
     # Shutdown
+    for task in startup_tasks:
+        if not task.done():
+            task.cancel()
+    await invalidation_bus.stop()
     await db_service.disconnect()
     logging.info("Database disconnected")
 
 
+# auto: in-memory engine when enabled, else substring match; text: Mongo $text
+SEARCH_MODE_PATTERN = "^(auto|text|regex)$"
+
+PRODUCT_SORT_PATTERN = "^(default|price-asc|price-desc|rating|reviews|discount|popular)$"
+
+
+def respond(response: Response, content):
+    # Opt-in: skip response_model revalidation and encode the service output directly
+    if fast_responses_enabled():
+        return FastJSONResponse(content, headers=dict(response.headers))
+    return content
+
+
+def set_corrected_query_header(response: Response, page: Page):
+    # Percent-encoded: header values are latin-1 and corrections keep their accents
+    if page.corrected_query:
+        response.headers["X-Search-Corrected"] = quote(page.corrected_query)
+
+
 # Create the main app without a prefix
 app = FastAPI(lifespan=lifespan)
 
+
+@app.exception_handler(HTTPException)
+async def overload_aware_http_exception_handler(request: Request, exc: HTTPException):
+    # Endpoints report any failure as a 500; when the cause was the pool wait
+    # queue or a query timeout, tell clients to back off and retry instead
+    if exc.status_code == 500 and isinstance(exc.__context__, OVERLOAD_ERRORS):
+        return JSONResponse({"detail": "Service busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
+    return await http_exception_handler(request, exc)
+
+
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
@@ -42,27 +156,136 @@ api_router = APIRouter(prefix="/api")
 # Product endpoints
 @api_router.get("/products", response_model=List[ProductResponse])
 async def get_products(
+    request: Request,
+    response: Response,
     category: Optional[str] = Query(None, description="Filter by category"),
     language: str = Query("es", description="Language for localization"),
     search: Optional[str] = Query(None, description="Search term"),
     limit: int = Query(50, ge=1, le=100, description="Number of products to return"),
-    skip: int = Query(0, ge=0, description="Number of products to skip")
+    skip: int = Query(0, ge=0, description="Number of products to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; supersedes skip"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating"),
+    min_discount: Optional[float] = Query(None, ge=0, le=100, description="Minimum percent off originalPrice"),
+    search_mode: str = Query("auto", pattern=SEARCH_MODE_PATTERN, description="Search strategy"),
+    sort: str = Query("default", pattern=PRODUCT_SORT_PATTERN, description="Sort order")
 ):
     """Get all products with optional filtering"""
+    ranges = RangeFilters(min_price, max_price, min_rating, min_discount)
+    if product_service.serves_from_snapshot(language, search, ranges, sort):
+        # Snapshot-served pages are fixed by the catalog version: answer 304 without a query
+        unchanged = conditional_get(
+            request,
+            response,
+            version_etag(request.url.path, product_service.catalog_version, request.url.query),
+            http_date(product_service.catalog_changed_at)
+        )
+        if unchanged is not None:
+            return unchanged
     try:
-        products = await product_service.get_products(
+        page = await product_service.get_products(
             category=category,
             language=language,
             search=search,
             limit=limit,
-            skip=skip
+            skip=skip,
+            cursor=cursor,
+            search_mode=search_mode,
+            ranges=ranges,
+            sort=sort
         )
-        return products
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        set_corrected_query_header(response, page)
+        return respond(response, page.items)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error getting products: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving products")
 
 
+@api_router.get("/products/facets", response_model=FacetedProductsResponse)
+async def get_faceted_products(
+    request: Request,
+    response: Response,
+    category: Optional[str] = Query(None, description="Filter by category"),
+    language: str = Query("es", description="Language for localization"),
+    search: Optional[str] = Query(None, description="Search term"),
+    limit: int = Query(50, ge=1, le=100, description="Number of products to return"),
+    skip: int = Query(0, ge=0, description="Number of products to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; supersedes skip"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating"),
+    min_discount: Optional[float] = Query(None, ge=0, le=100, description="Minimum percent off originalPrice"),
+    sort: str = Query("default", pattern=PRODUCT_SORT_PATTERN, description="Sort order")
+):
+    """Get a page of products with category, price and rating counts"""
+    ranges = RangeFilters(min_price, max_price, min_rating, min_discount)
+    if product_service.serves_from_snapshot(language, search, ranges, sort):
+        # Snapshot-served pages are fixed by the catalog version: answer 304 without a query
+        unchanged = conditional_get(
+            request,
+            response,
+            version_etag(request.url.path, product_service.catalog_version, request.url.query),
+            http_date(product_service.catalog_changed_at)
+        )
+        if unchanged is not None:
+            return unchanged
+    try:
+        page = await product_service.get_faceted_products(
+            category=category,
+            language=language,
+            search=search,
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+            ranges=ranges,
+            sort=sort
+        )
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        return respond(response, {"items": page.items, "total": page.total, "facets": page.facets})
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error getting faceted products: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving products")
+
+
+# Upper bound on IDs per batch request, so one call stays one bounded $in
+MAX_BATCH_IDS = 300
+
+
+async def resolve_product_batch(product_ids: List[str], language: str) -> dict:
+    if len(product_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    try:
+        items, missing = await product_service.get_products_batch(product_ids, language)
+        return {"items": items, "missing": missing}
+    except Exception as e:
+        logging.error(f"Error getting product batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving products")
+
+
+@api_router.get("/products/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    ids: str = Query(..., description="Comma-separated product IDs"),
+    language: str = Query("es", description="Language for localization")
+):
+    """Get several products by ID, in the order requested"""
+    product_ids = [product_id.strip() for product_id in ids.split(",") if product_id.strip()]
+    return await resolve_product_batch(product_ids, language)
+
+
+@api_router.post("/products/batch", response_model=ProductBatchResponse)
+async def post_products_batch(request: ProductBatchRequest):
+    """Get several products by ID, for lists too long for a query string"""
+    return await resolve_product_batch(request.ids, request.language)
+
+
 @api_router.get("/products/{product_id}")
 async def get_product_by_id(product_id: str):
     """Get a specific product by ID"""
@@ -83,22 +306,7 @@ async def create_product(product_data: ProductCreate):
     """Create a new product"""
     try:
         product = await product_service.create_product(product_data)
-        return ProductResponse(
-            id=str(product.id),
-            name=product.name.es,  # Default to Spanish
-            description=product.description.es,
-            category=product.category,
-            price=product.price,
-            originalPrice=product.original_price,
-            image=product.image,
-            amazonLink=product.amazon_link,
-            rating=product.rating,
-            reviews=product.reviews,
-            features=product.features.get("es", []),
-            isActive=product.is_active,
-            createdAt=product.created_at,
-            updatedAt=product.updated_at
-        )
+        return product_service.localize(product, "es")  # Default to Spanish
     except Exception as e:
         logging.error(f"Error creating product: {str(e)}")
         raise HTTPException(status_code=500, detail="Error creating product")
@@ -136,40 +344,64 @@ async def delete_product(product_id: str):
 
 # Categories endpoints
 @api_router.get("/categories")
-async def get_categories(language: str = Query("es", description="Language for localization")):
+async def get_categories(
+    request: Request,
+    language: str = Query("es", description="Language for localization")
+):
     """Get all categories"""
     try:
-        categories_data = await db_service.find_many("categories", {"is_active": True})
-        categories = []
-        for category_data in categories_data:
-            categories.append({
-                "id": category_data["category_id"],
-                "name": category_data["name"][language],
-                "icon": category_data["icon"]
-            })
-        return categories
+        payload, etag = await category_service.get_categories_payload(language)
     except Exception as e:
         logging.error(f"Error getting categories: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving categories")
 
+    response = Response(content=payload, media_type="application/json")
+    return conditional_get(request, response, etag) or response
+
+
+@api_router.post("/categories", response_model=CategoryResponse)
+async def create_category(category: CategoryCreate):
+    """Create a new category"""
+    try:
+        created = await category_service.create_category(category)
+        return {
+            **category_service.localize(created.dict(), "es"),
+            "isActive": created.is_active,
+            "createdAt": created.created_at
+        }
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Category already exists")
+    except Exception as e:
+        logging.error(f"Error creating category: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error creating category")
+
 
 # Articles endpoints
 @api_router.get("/articles", response_model=List[ArticleSummary])
 async def get_articles(
+    response: Response,
     category: Optional[str] = Query(None, description="Filter by category"),
     language: str = Query("es", description="Language for localization"),
     limit: int = Query(20, ge=1, le=100, description="Number of articles to return"),
-    skip: int = Query(0, ge=0, description="Number of articles to skip")
+    skip: int = Query(0, ge=0, description="Number of articles to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; supersedes skip"),
+    sort: str = Query("newest", pattern="^(newest|oldest|most-linked)$", description="Sort order")
 ):
     """Get all published articles"""
     try:
-        articles = await article_service.get_articles(
+        page = await article_service.get_articles(
             category=category,
             language=language,
             limit=limit,
-            skip=skip
+            skip=skip,
+            cursor=cursor,
+            sort=sort
         )
-        return articles
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        return respond(response, page.items)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error getting articles: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving articles")
@@ -178,6 +410,7 @@ async def get_articles(
 @api_router.get("/articles/{slug}", response_model=ArticleResponse)
 async def get_article_by_slug(
     slug: str,
+    response: Response,
     language: str = Query("es", description="Language for localization")
 ):
     """Get a specific article by slug"""
@@ -185,7 +418,8 @@ async def get_article_by_slug(
         article = await article_service.get_article_by_slug(slug, language)
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
-        return article
+        response.headers["Last-Modified"] = http_date(article.updatedAt)
+        return respond(response, article)
     except HTTPException:
         raise
     except Exception as e:
@@ -202,7 +436,11 @@ async def get_related_articles(
     """Get related articles by category"""
     try:
         # First get the article to find its category
-        article_data = await db_service.find_one("articles", {"_id": ObjectId(article_id)})
+        article_data = await db_service.find_one(
+            "articles",
+            {"_id": ObjectId(article_id)},
+            projection={"category": 1}
+        )
         if not article_data:
             raise HTTPException(status_code=404, detail="Article not found")
         
@@ -222,12 +460,32 @@ async def get_related_articles(
 
 # Favorites endpoints
 @api_router.get("/favorites/{user_id}")
-async def get_user_favorites(user_id: str):
+async def get_user_favorites(
+    user_id: str,
+    response: Response,
+    expand: Optional[str] = Query(None, pattern="^products$", description="Set to 'products' to embed product cards"),
+    language: str = Query("es", description="Language for expanded products"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; all favorites when omitted"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor")
+):
     """Get user's favorite products"""
     try:
-        favorites_data = await db_service.find_many("favorites", {"user_id": user_id})
-        product_ids = [fav["product_id"] for fav in favorites_data]
-        return {"favorites": [str(pid) for pid in product_ids]}
+        if cursor and not limit:
+            limit = 50
+        page = await favorite_service.get_favorites(
+            user_id,
+            limit=limit,
+            cursor=cursor,
+            expand=expand == "products",
+            language=language
+        )
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        if expand:
+            return {"favorites": [product["id"] for product in page.items], "products": page.items}
+        return {"favorites": page.items}
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error getting favorites: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving favorites")
@@ -236,87 +494,116 @@ async def get_user_favorites(user_id: str):
 @api_router.post("/favorites")
 async def add_favorite(favorite_data: FavoriteCreate):
     """Add product to favorites"""
+    if not ObjectId.is_valid(favorite_data.product_id):
+        raise HTTPException(status_code=400, detail="Invalid product ID")
     try:
-        from bson import ObjectId
-        
-        # Check if already favorited
-        existing = await db_service.find_one("favorites", {
-            "user_id": favorite_data.user_id,
-            "product_id": ObjectId(favorite_data.product_id)
-        })
-        
-        if existing:
+        created = await favorite_service.add_favorite(favorite_data.user_id, favorite_data.product_id)
+        if not created:
             return {"message": "Product already in favorites"}
-        
-        favorite_dict = {
-            "user_id": favorite_data.user_id,
-            "product_id": ObjectId(favorite_data.product_id),
-            "created_at": datetime.utcnow()
-        }
-        
-        await db_service.insert_one("favorites", favorite_dict)
         return {"message": "Product added to favorites"}
     except Exception as e:
         logging.error(f"Error adding favorite: {str(e)}")
         raise HTTPException(status_code=500, detail="Error adding favorite")
 
 
+# Upper bound on adds plus removes per bulk request
+MAX_BULK_FAVORITES = 500
+
+
+@api_router.post("/favorites/bulk")
+async def bulk_update_favorites(bulk_data: FavoriteBulkRequest):
+    """Add and remove many favorites at once, e.g. to sync guest favorites on login"""
+    if len(bulk_data.add) + len(bulk_data.remove) > MAX_BULK_FAVORITES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_FAVORITES} changes per request")
+    try:
+        return await favorite_service.apply_bulk(bulk_data.user_id, bulk_data.add, bulk_data.remove)
+    except Exception as e:
+        logging.error(f"Error updating favorites: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error updating favorites")
+
+
 @api_router.delete("/favorites/{user_id}/{product_id}")
 async def remove_favorite(user_id: str, product_id: str):
     """Remove product from favorites"""
+    if not ObjectId.is_valid(product_id):
+        raise HTTPException(status_code=404, detail="Favorite not found")
     try:
-        from bson import ObjectId
-        
-        result = await db_service.delete_one("favorites", {
-            "user_id": user_id,
-            "product_id": ObjectId(product_id)
-        })
-        
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Favorite not found")
-        
-        return {"message": "Product removed from favorites"}
-    except HTTPException:
-        raise
+        removed = await favorite_service.remove_favorite(user_id, product_id)
     except Exception as e:
         logging.error(f"Error removing favorite: {str(e)}")
         raise HTTPException(status_code=500, detail="Error removing favorite")
 
+    if not removed:
+        raise HTTPException(status_code=404, detail="Favorite not found")
+    return {"message": "Product removed from favorites"}
+
+
+# Operational metrics
+@api_router.get("/stats")
+async def get_stats():
+    """Request coalescing, cache, invalidation bus and connection pool counters"""
+    return {
+        "database": db_service.stats(),
+        "single_flight": single_flight_stats(),
+        "query_cache": query_cache.stats(),
+        "invalidation_bus": invalidation_bus.stats()
+    }
+
 
 # Search endpoints
 @api_router.get("/search")
 async def search_products(
+    response: Response,
     q: str = Query(..., description="Search query"),
     language: str = Query("es", description="Language for search"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    limit: int = Query(20, ge=1, le=100, description="Number of results to return")
+    limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
+    mode: str = Query("auto", pattern=SEARCH_MODE_PATTERN, description="Search strategy")
 ):
     """Search products"""
     try:
-        products = await product_service.get_products(
+        page = await product_service.get_products(
             category=category,
             language=language,
             search=q,
-            limit=limit
+            limit=limit,
+            search_mode=mode
         )
-        return products
+        set_corrected_query_header(response, page)
+        return respond(response, page.items)
     except Exception as e:
         logging.error(f"Error searching products: {str(e)}")
         raise HTTPException(status_code=500, detail="Error searching products")
 
 
+@api_router.get("/search/suggest")
+async def search_suggest(
+    q: str = Query(..., min_length=1, description="Prefix typed so far"),
+    language: str = Query("es", description="Language for suggestions"),
+    limit: int = Query(8, ge=1, le=20, description="Number of suggestions to return")
+):
+    """Typeahead suggestions from product names, categories and article titles"""
+    try:
+        return await suggest_index.suggest(q, language=language, limit=limit)
+    except Exception as e:
+        logging.error(f"Error getting suggestions: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error getting suggestions")
+
+
 @api_router.get("/search/articles")
 async def search_articles(
     q: str = Query(..., description="Search query"),
     language: str = Query("es", description="Language for search"),
-    limit: int = Query(10, ge=1, le=50, description="Number of results to return")
+    limit: int = Query(10, ge=1, le=50, description="Number of results to return"),
+    mode: str = Query("auto", pattern=SEARCH_MODE_PATTERN, description="Search strategy")
 ):
     """Search articles"""
     try:
         articles = await article_service.search_articles(
             query=q,
             language=language,
-            limit=limit
+            limit=limit,
+            mode=mode
         )
         return articles
     except Exception as e:
@@ -333,12 +620,18 @@ async def root():
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(ConditionalGetMiddleware)
+
+# Outside ConditionalGetMiddleware so it sees the ETag that keys its cache
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Search-Corrected"],
 )
 
 # Configure logging
@@ -347,7 +640,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-# Import datetime for favorites
-from datetime import datetime
-from bson import ObjectId
@@ -1,20 +1,167 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from bson import ObjectId
-from models.article import Article, ArticleCreate, ArticleResponse, ArticleSummary
+from models.article import Article, ArticleCreate, ArticleResponse
 from services.database import db_service
+from services.localization import (
+    SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE, LOCALIZED_FIELD, SEARCH_TEXT_FIELD, TEXT_LANGUAGE_FIELD,
+    TEXT_SEARCH_LANGUAGES, localized_view
+)
+from services.pagination import Page, decode_cursor, keyset_filter, cursor_after
+from services.search_engine import search_engine, strip_html
+from services.fuzzy_index import fuzzy_index
+from services.search_indexes import search_indexes
+from services.single_flight import single_flight, invalidate_flights
+from services.query_cache import cached, query_cache
+from services.invalidation_bus import invalidation_bus
+from services.config import env_bool
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
 
+def article_listing_tags(arguments: dict, page: Page) -> List[str]:
+    tags = [f"article:{item['slug']}" for item in page.items]
+    tags.append(f"article-category:{arguments['category']}" if arguments["category"] else "articles:all")
+    return tags
+
+
 class ArticleService:
     def __init__(self):
         self.collection_name = "articles"
+        self.default_sort = "newest"
+        self.sorts = {
+            "newest": [("published_date", -1), ("_id", -1)],
+            "oldest": [("published_date", 1), ("_id", 1)],
+            "most-linked": [("product_count", -1), ("published_date", -1), ("_id", -1)]
+        }
+
+    @property
+    def search_engine_enabled(self) -> bool:
+        return env_bool("SEARCH_ENGINE_ENABLED")
+
+    def summarize(self, article: Article, language: str) -> dict:
+        return {
+            "id": str(article.id),
+            "title": article.title.dict()[language],
+            "slug": article.slug,
+            "excerpt": article.excerpt.dict()[language],
+            "category": article.category,
+            "featuredImage": article.featured_image,
+            "tags": article.tags,
+            "author": article.author,
+            "publishedDate": article.published_date
+        }
+
+    def build_localized_views(self, article: Article) -> Dict[str, dict]:
+        return {language: self.summarize(article, language) for language in SUPPORTED_LANGUAGES}
+
+    def summary_projection(self, language: str) -> dict:
+        """Fields needed to answer an ArticleSummary, leaving bodies and SEO out."""
+        return {
+            f"{LOCALIZED_FIELD}.{language}": 1,
+            f"title.{language}": 1,
+            f"excerpt.{language}": 1,
+            "slug": 1,
+            "category": 1,
+            "featured_image": 1,
+            "tags": 1,
+            "author": 1,
+            "published_date": 1,
+            "product_count": 1
+        }
+
+    def view_for(self, article_data: dict, language: str) -> dict:
+        view = localized_view(article_data, language)
+        if view is None:
+            # Documents written before views existed are summarized on the fly
+            # from the projected summary fields.
+            published_date = article_data.get("published_date")
+            if published_date is None:
+                published_date = article_data["_id"].generation_time.replace(tzinfo=None)
+            view = {
+                "id": str(article_data["_id"]),
+                "title": article_data["title"][language],
+                "slug": article_data["slug"],
+                "excerpt": article_data["excerpt"][language],
+                "category": article_data["category"],
+                "featuredImage": article_data["featured_image"],
+                "tags": article_data["tags"],
+                "author": article_data["author"],
+                "publishedDate": published_date
+            }
+        return view
+
+    def build_search_text(self, article: Article) -> Dict[str, dict]:
+        return {
+            language: {
+                TEXT_LANGUAGE_FIELD: TEXT_SEARCH_LANGUAGES[language],
+                "title": article.title.dict()[language],
+                "excerpt": article.excerpt.dict()[language],
+                "content": strip_html(article.content.dict()[language]),
+                "tags": article.tags
+            }
+            for language in SUPPORTED_LANGUAGES
+        }
+
+    def derived_fields(self, article: Article) -> dict:
+        """Fields computed from the article at write time so reads can index them."""
+        return {
+            LOCALIZED_FIELD: self.build_localized_views(article),
+            SEARCH_TEXT_FIELD: self.build_search_text(article),
+            "product_count": len(article.products)
+        }
+
+    async def backfill_derived_fields(self) -> int:
+        try:
+            articles_data = await db_service.find_many(
+                self.collection_name,
+                {"$or": [
+                    {LOCALIZED_FIELD: {"$exists": False}},
+                    {SEARCH_TEXT_FIELD: {"$exists": False}},
+                    {"product_count": {"$exists": False}},
+                    {"updated_at": {"$exists": False}}
+                ]}
+            )
+            for article_data in articles_data:
+                article = Article(**article_data)
+                update_dict = self.derived_fields(article)
+                # Unstamped rows would otherwise report a new updatedAt on every read
+                for field in ("created_at", "updated_at"):
+                    if field not in article_data:
+                        update_dict[field] = article.published_date
+                await db_service.update_one(self.collection_name, {"_id": article_data["_id"]}, update_dict)
+            return len(articles_data)
+        except Exception as e:
+            logger.error(f"Error backfilling article views: {str(e)}")
+            raise
+
+    def invalidate(self, *tags: str):
+        invalidate_flights("articles.")
+        query_cache.invalidate(*tags)
+
+    async def apply_change(self, event: dict):
+        """Bring this worker's caches and indexes up to date with another worker's write."""
+        self.invalidate(*event["tags"])
+        article_data = await db_service.find_one(self.collection_name, {"_id": ObjectId(event["article_id"])})
+        if article_data:
+            search_indexes.index_article(article_data)
 
     async def create_article(self, article_data: ArticleCreate) -> Article:
         try:
-            article_dict = article_data.dict(by_alias=True, exclude_unset=True)
+            article_dict = article_data.dict()
+            article_dict["_id"] = ObjectId()
+            article = Article(**article_dict)
+            article_dict["published_date"] = article.published_date
+            article_dict["created_at"] = article.created_at
+            article_dict["updated_at"] = article.updated_at
+            article_dict.update(self.derived_fields(article))
+
             result = await db_service.insert_one(self.collection_name, article_dict)
+            search_indexes.index_article(article_dict)
+            tags = [f"article:{article_dict['slug']}", f"article-category:{article_dict['category']}", "articles:all"]
+            self.invalidate(*tags)
+            await invalidation_bus.publish("articles", article_id=str(result.inserted_id), tags=tags)
             
             created_article = await db_service.find_one(
                 self.collection_name, 
@@ -25,11 +172,14 @@ class ArticleService:
             logger.error(f"Error creating article: {str(e)}")
             raise
 
+    @cached("articles.get_article_by_slug", tags=lambda arguments, article: [f"article:{arguments['slug']}"])
+    @single_flight("articles.get_article_by_slug")
     async def get_article_by_slug(self, slug: str, language: str = "es") -> Optional[ArticleResponse]:
         try:
             article_data = await db_service.find_one(
                 self.collection_name,
-                {"slug": slug, "is_published": True}
+                {"slug": slug, "is_published": True},
+                projection={LOCALIZED_FIELD: 0, SEARCH_TEXT_FIELD: 0}
             )
             
             if article_data:
@@ -57,57 +207,62 @@ class ArticleService:
             logger.error(f"Error getting article by slug: {str(e)}")
             raise
 
+    @cached("articles.get_articles", tags=article_listing_tags)
+    @single_flight("articles.get_articles")
     async def get_articles(
         self, 
         category: Optional[str] = None,
         language: str = "es",
         limit: int = 20,
-        skip: int = 0
-    ) -> List[ArticleSummary]:
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None
+    ) -> Page:
+        sort_spec = self.sorts[sort or self.default_sort]
+
+        # A cursor supersedes skip: the page starts right after the cursor row
+        after = decode_cursor(cursor, sort_spec) if cursor else None
+        if after:
+            skip = 0
+
         try:
             filter_dict = {"is_published": True}
             
             if category:
                 filter_dict["category"] = category
+
+            if after:
+                filter_dict.update(keyset_filter(sort_spec, after))
             
             articles_data = await db_service.find_many(
                 self.collection_name,
                 filter_dict,
                 limit=limit,
-                skip=skip
+                skip=skip,
+                projection=self.summary_projection(language),
+                sort=sort_spec,
+                secondary=True
             )
             
-            # Sort by published_date descending
-            articles_data.sort(key=lambda x: x.get("published_date", x.get("created_at")), reverse=True)
-            
-            articles = []
-            for article_data in articles_data:
-                article = Article(**article_data)
-                summary = ArticleSummary(
-                    id=str(article.id),
-                    title=article.title.dict()[language],
-                    slug=article.slug,
-                    excerpt=article.excerpt.dict()[language],
-                    category=article.category,
-                    featuredImage=article.featured_image,
-                    tags=article.tags,
-                    author=article.author,
-                    publishedDate=article.published_date
-                )
-                articles.append(summary)
-            
-            return articles
+            return Page(
+                [self.view_for(article_data, language) for article_data in articles_data],
+                cursor_after(sort_spec, articles_data, limit)
+            )
         except Exception as e:
             logger.error(f"Error getting articles: {str(e)}")
             raise
 
+    @cached(
+        "articles.get_related_articles",
+        tags=lambda arguments, articles: [f"article-category:{arguments['category']}"]
+    )
     async def get_related_articles(
         self, 
         category: str, 
         current_article_id: str,
         language: str = "es",
         limit: int = 3
-    ) -> List[ArticleSummary]:
+    ) -> List[dict]:
         try:
             filter_dict = {
                 "is_published": True,
@@ -118,26 +273,12 @@ class ArticleService:
             articles_data = await db_service.find_many(
                 self.collection_name,
                 filter_dict,
-                limit=limit
+                limit=limit,
+                projection=self.summary_projection(language),
+                secondary=True
             )
             
-            articles = []
-            for article_data in articles_data:
-                article = Article(**article_data)
-                summary = ArticleSummary(
-                    id=str(article.id),
-                    title=article.title.dict()[language],
-                    slug=article.slug,
-                    excerpt=article.excerpt.dict()[language],
-                    category=article.category,
-                    featuredImage=article.featured_image,
-                    tags=article.tags,
-                    author=article.author,
-                    publishedDate=article.published_date
-                )
-                articles.append(summary)
-            
-            return articles
+            return [self.view_for(article_data, language) for article_data in articles_data]
         except Exception as e:
             logger.error(f"Error getting related articles: {str(e)}")
             raise
@@ -146,42 +287,82 @@ class ArticleService:
         self,
         query: str,
         language: str = "es",
-        limit: int = 10
-    ) -> List[ArticleSummary]:
+        limit: int = 10,
+        mode: str = "auto"
+    ) -> List[dict]:
+        articles = await self._find_articles(query, language, limit, mode)
+        if articles:
+            return articles
+
+        # Nothing matched as typed: retry once with misspellings and missing accents fixed
+        try:
+            corrected = await fuzzy_index.correct_article_query(query, language)
+        except Exception:
+            return articles
+        if not corrected:
+            return articles
+        return await self._find_articles(corrected, language, limit, mode)
+
+    async def _find_articles(self, query: str, language: str, limit: int, mode: str) -> List[dict]:
+        if language not in SUPPORTED_LANGUAGES:
+            # Like categories and suggestions: unknown languages get the default one
+            language = DEFAULT_LANGUAGE
         try:
+            if mode == "text":
+                projection = self.summary_projection(language)
+                projection["score"] = {"$meta": "textScore"}
+                articles_data = await db_service.find_many(
+                    self.collection_name,
+                    {
+                        "$text": {"$search": query, "$language": TEXT_SEARCH_LANGUAGES[language]},
+                        "is_published": True
+                    },
+                    limit=limit,
+                    projection=projection,
+                    sort=[("score", {"$meta": "textScore"}), ("_id", 1)],
+                    secondary=True
+                )
+                return [
+                    dict(self.view_for(article_data, language), score=article_data["score"])
+                    for article_data in articles_data
+                ]
+
+            if mode == "auto" and self.search_engine_enabled and search_engine.supports(language):
+                article_ids = search_engine.search_articles(query, language, limit=limit)
+                articles_data = await db_service.find_many(
+                    self.collection_name,
+                    {"_id": {"$in": [ObjectId(article_id) for article_id in article_ids]}, "is_published": True},
+                    projection=self.summary_projection(language),
+                    secondary=True
+                )
+                by_id = {str(article_data["_id"]): article_data for article_data in articles_data}
+                return [
+                    self.view_for(by_id[article_id], language)
+                    for article_id in article_ids
+                    if article_id in by_id
+                ]
+
+            # User input is matched literally, never run as a regex
+            pattern = re.escape(query)
             filter_dict = {
                 "is_published": True,
                 "$or": [
-                    {f"title.{language}": {"$regex": query, "$options": "i"}},
-                    {f"content.{language}": {"$regex": query, "$options": "i"}},
-                    {f"excerpt.{language}": {"$regex": query, "$options": "i"}},
-                    {"tags": {"$in": [{"$regex": query, "$options": "i"}]}}
+                    {f"title.{language}": {"$regex": pattern, "$options": "i"}},
+                    {f"content.{language}": {"$regex": pattern, "$options": "i"}},
+                    {f"excerpt.{language}": {"$regex": pattern, "$options": "i"}},
+                    {"tags": {"$regex": pattern, "$options": "i"}}
                 ]
             }
             
             articles_data = await db_service.find_many(
                 self.collection_name,
                 filter_dict,
-                limit=limit
+                limit=limit,
+                projection=self.summary_projection(language),
+                secondary=True
             )
             
-            articles = []
-            for article_data in articles_data:
-                article = Article(**article_data)
-                summary = ArticleSummary(
-                    id=str(article.id),
-                    title=article.title.dict()[language],
-                    slug=article.slug,
-                    excerpt=article.excerpt.dict()[language],
-                    category=article.category,
-                    featuredImage=article.featured_image,
-                    tags=article.tags,
-                    author=article.author,
-                    publishedDate=article.published_date
-                )
-                articles.append(summary)
-            
-            return articles
+            return [self.view_for(article_data, language) for article_data in articles_data]
         except Exception as e:
             logger.error(f"Error searching articles: {str(e)}")
             raise
@@ -0,0 +1,263 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from bisect import bisect_right
+from datetime import datetime
+from itertools import islice
+from services.fast_json import dumps, loads
+import mmap
+import os
+import struct
+
+
+class CatalogSnapshot:
+    """Read-only, in-memory view of the active catalog at a given version.
+
+    Snapshots are never mutated after construction: the product service builds
+    a new one and swaps the reference when the catalog version changes.
+    """
+
+    def __init__(self, version: int, products: Dict[str, List[dict]]):
+        self.version = version
+        self.products = products
+        self._search_text = {
+            language: [self._searchable_text(product) for product in items]
+            for language, items in products.items()
+        }
+        self._by_id = {
+            language: {product["id"]: product for product in items}
+            for language, items in products.items()
+        }
+        # Products are held in _id order, and hex ObjectIds sort the same way
+        self._ids = {
+            language: [product["id"] for product in items]
+            for language, items in products.items()
+        }
+
+    @staticmethod
+    def _searchable_text(product: dict) -> List[str]:
+        return [product["name"].casefold(), product["description"].casefold()] + [
+            feature.casefold() for feature in product["features"]
+        ]
+
+    def supports(self, language: str) -> bool:
+        return language in self.products
+
+    def matches(
+        self,
+        language: str,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        after_id: Optional[str] = None
+    ) -> Iterator[dict]:
+        """Products matching the filters, in listing order, starting after ``after_id``."""
+        items = self.products[language]
+        texts = self._search_text[language]
+        needle = search.casefold() if search else None
+
+        start = bisect_right(self._ids[language], after_id) if after_id else 0
+
+        for position in range(start, len(items)):
+            product = items[position]
+            if category and product["category"] != category:
+                continue
+            if needle and not any(needle in field for field in texts[position]):
+                continue
+            yield product
+
+    def query(
+        self,
+        language: str,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: int = 50,
+        skip: int = 0,
+        after_id: Optional[str] = None
+    ) -> List[dict]:
+        return list(islice(self.matches(language, category, search, after_id), skip, skip + limit))
+
+    def get_many(self, language: str, product_ids: List[str]) -> List[dict]:
+        by_id = self._by_id[language]
+        return [by_id[product_id] for product_id in product_ids if product_id in by_id]
+
+    def __len__(self) -> int:
+        return max((len(items) for items in self.products.values()), default=0)
+
+
+# Snapshot file layout: MAGIC, a little-endian u32 header length, a JSON header,
+# then per language a table of fixed-width ids (in listing order, so they can
+# be bisected) and three blob tables (JSON views, searchable text, category).
+# A blob table is count + 1 u64 absolute offsets followed by the blobs.
+MAGIC = b"BGSNAP1\n"
+ID_WIDTH = 24
+OFFSET = struct.Struct("<Q")
+HEADER_LENGTH = struct.Struct("<I")
+BLOB_TABLES = ("views", "texts", "categories")
+
+
+def _identity(stat: os.stat_result) -> tuple:
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def snapshot_file_identity(path: str) -> Optional[tuple]:
+    """Changes whenever a new snapshot file is swapped in at ``path``."""
+    try:
+        return _identity(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def _blob_table(blobs: List[bytes], start: int) -> bytes:
+    position = start + OFFSET.size * (len(blobs) + 1)
+    offsets = []
+    for blob in blobs:
+        offsets.append(position)
+        position += len(blob)
+    offsets.append(position)
+    return b"".join(OFFSET.pack(offset) for offset in offsets) + b"".join(blobs)
+
+
+def write_snapshot_file(path: str, products: Dict[str, List[dict]]):
+    """Write ``products`` (localized views per language) and swap the file in atomically."""
+    languages = sorted(products)
+    # Offsets are absolute, so the header is sized with placeholders wider
+    # than any real offset, then padded to that size once the offsets are known
+    placeholder = 10 ** 18
+    header = {"built_at": datetime.utcnow().isoformat(), "languages": {
+        language: dict({"count": len(products[language]), "ids": placeholder},
+                       **{table: placeholder for table in BLOB_TABLES})
+        for language in languages
+    }}
+    header_size = len(MAGIC) + HEADER_LENGTH.size + len(dumps(header))
+
+    body = []
+    position = header_size
+    for language in languages:
+        items = products[language]
+        sections = header["languages"][language]
+        ids = "".join(product["id"] for product in items).encode("ascii")
+        sections["ids"] = position
+        body.append(ids)
+        position += len(ids)
+        blobs = {
+            "views": [dumps(product) for product in items],
+            "texts": [
+                "\0".join(CatalogSnapshot._searchable_text(product)).encode("utf-8") for product in items
+            ],
+            "categories": [product["category"].encode("utf-8") for product in items],
+        }
+        for table in BLOB_TABLES:
+            sections[table] = position
+            chunk = _blob_table(blobs[table], position)
+            body.append(chunk)
+            position += len(chunk)
+
+    encoded_header = dumps(header)
+    # Pad with spaces to the reserved size; JSON ignores trailing whitespace
+    encoded_header += b" " * (header_size - len(MAGIC) - HEADER_LENGTH.size - len(encoded_header))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as snapshot_file:
+        snapshot_file.write(MAGIC + HEADER_LENGTH.pack(len(encoded_header)) + encoded_header)
+        for chunk in body:
+            snapshot_file.write(chunk)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    # Readers either keep the old inode mapped or open the new file, never a partial one
+    os.replace(temporary, path)
+
+
+class MappedCatalogSnapshot:
+    """CatalogSnapshot read from a memory-mapped snapshot file.
+
+    Every worker maps the same file, so the pages are shared through the OS
+    page cache instead of each process holding its own copy. Filters run
+    against the mapping in place; only the products returned are decoded,
+    with their dates as ISO strings (the response models parse them back).
+    """
+
+    def __init__(self, path: str, version: int):
+        self.version = version
+        with open(path, "rb") as snapshot_file:
+            # From the open file: the path may already name a newer snapshot
+            self.identity = _identity(os.fstat(snapshot_file.fileno()))
+            self._map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot file")
+        (header_length,) = HEADER_LENGTH.unpack_from(self._map, len(MAGIC))
+        start = len(MAGIC) + HEADER_LENGTH.size
+        self._sections: Dict[str, dict] = loads(self._map[start:start + header_length])["languages"]
+
+    def _blob_bounds(self, language: str, table: str, position: int) -> Tuple[int, int]:
+        base = self._sections[language][table] + position * OFFSET.size
+        return OFFSET.unpack_from(self._map, base)[0], OFFSET.unpack_from(self._map, base + OFFSET.size)[0]
+
+    def _view(self, language: str, position: int) -> dict:
+        start, end = self._blob_bounds(language, "views", position)
+        return loads(self._map[start:end])
+
+    def _id_at(self, language: str, position: int) -> bytes:
+        start = self._sections[language]["ids"] + position * ID_WIDTH
+        return self._map[start:start + ID_WIDTH]
+
+    def _position_after(self, language: str, product_id: str) -> int:
+        # bisect_right over the fixed-width id table
+        wanted = product_id.encode("ascii")
+        low, high = 0, self._sections[language]["count"]
+        while low < high:
+            middle = (low + high) // 2
+            if wanted < self._id_at(language, middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def supports(self, language: str) -> bool:
+        return language in self._sections
+
+    def matches(
+        self,
+        language: str,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        after_id: Optional[str] = None
+    ) -> Iterator[dict]:
+        """Products matching the filters, in listing order, starting after ``after_id``."""
+        wanted_category = category.encode("utf-8") if category else None
+        # Fields are joined with NUL, so a match never spans two fields
+        needle = search.casefold().encode("utf-8") if search else None
+
+        start = self._position_after(language, after_id) if after_id else 0
+
+        for position in range(start, self._sections[language]["count"]):
+            if wanted_category:
+                category_start, category_end = self._blob_bounds(language, "categories", position)
+                if self._map[category_start:category_end] != wanted_category:
+                    continue
+            if needle:
+                text_start, text_end = self._blob_bounds(language, "texts", position)
+                if self._map.find(needle, text_start, text_end) == -1:
+                    continue
+            yield self._view(language, position)
+
+    def query(
+        self,
+        language: str,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: int = 50,
+        skip: int = 0,
+        after_id: Optional[str] = None
+    ) -> List[dict]:
+        return list(islice(self.matches(language, category, search, after_id), skip, skip + limit))
+
+    def get_many(self, language: str, product_ids: List[str]) -> List[dict]:
+        products = []
+        for product_id in product_ids:
+            if len(product_id) != ID_WIDTH or not product_id.isascii():
+                continue
+            position = self._position_after(language, product_id) - 1
+            if position >= 0 and self._id_at(language, position) == product_id.encode("ascii"):
+                products.append(self._view(language, position))
+        return products
+
+    def __len__(self) -> int:
+        return max((sections["count"] for sections in self._sections.values()), default=0)
@@ -0,0 +1,114 @@
+from typing import Dict, Optional, Tuple
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from models.category import Category, CategoryCreate
+from services.database import db_service
+from services.config import env_int
+from services.fast_json import dumps
+from services.http_cache import body_etag
+from services.localization import SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE
+from services.search_indexes import search_indexes
+from services.invalidation_bus import invalidation_bus
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryService:
+    """Active categories, held in memory as ready-to-send JSON per language.
+
+    Writes through this service, and invalidation bus events for writes in
+    other workers, rebuild the payloads, so by default they never expire.
+    CATEGORIES_CACHE_TTL (seconds, 0 = never) is only needed when categories
+    are edited in Mongo directly.
+    """
+
+    def __init__(self):
+        self.collection_name = "categories"
+        # language -> (serialized payload, ETag)
+        self._payloads: Optional[Dict[str, Tuple[bytes, str]]] = None
+        self._loaded_at = 0.0
+        # Bumped by every write, so a load that raced a write is not kept
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def localize(self, category_data: dict, language: str) -> dict:
+        names = category_data["name"]
+        return {
+            "id": category_data["category_id"],
+            "name": names.get(language) or names[DEFAULT_LANGUAGE],
+            "icon": category_data["icon"]
+        }
+
+    def invalidate(self):
+        self._generation += 1
+        self._payloads = None
+
+    async def apply_change(self, event: dict):
+        """Drop the payloads after another worker's write and index the new category."""
+        self.invalidate()
+        category_data = await db_service.find_one(self.collection_name, {"category_id": event["category_id"]})
+        if category_data:
+            search_indexes.index_category(category_data)
+
+    def _expired(self) -> bool:
+        ttl = env_int("CATEGORIES_CACHE_TTL", 0)
+        return ttl > 0 and time.monotonic() - self._loaded_at > ttl
+
+    async def _load(self) -> Dict[str, Tuple[bytes, str]]:
+        payloads = self._payloads
+        if payloads is not None and not self._expired():
+            return payloads
+
+        async with self._lock:
+            if self._payloads is not None and not self._expired():
+                return self._payloads
+
+            generation = self._generation
+            categories_data = await db_service.find_many(
+                self.collection_name,
+                {"is_active": True},
+                projection={"category_id": 1, "name": 1, "icon": 1}
+            )
+            payloads = {}
+            for language in SUPPORTED_LANGUAGES:
+                body = dumps([self.localize(category_data, language) for category_data in categories_data])
+                payloads[language] = (body, body_etag(body))
+            if generation == self._generation:
+                self._payloads = payloads
+                self._loaded_at = time.monotonic()
+            logger.info(f"Cached {len(categories_data)} categories")
+            return payloads
+
+    async def get_categories_payload(self, language: str = DEFAULT_LANGUAGE) -> Tuple[bytes, str]:
+        """Serialized category list and its ETag; unknown languages get the default one."""
+        try:
+            payloads = await self._load()
+            return payloads.get(language) or payloads[DEFAULT_LANGUAGE]
+        except Exception as e:
+            logger.error(f"Error getting categories: {str(e)}")
+            raise
+
+    async def create_category(self, category_data: CategoryCreate) -> Category:
+        try:
+            category_dict = category_data.dict()
+            category_dict["created_at"] = datetime.utcnow()
+            result = await db_service.insert_one(self.collection_name, category_dict)
+            search_indexes.index_category(category_dict)
+            self.invalidate()
+            await invalidation_bus.publish("categories", category_id=category_dict["category_id"])
+
+            created_category = await db_service.find_one(self.collection_name, {"_id": result.inserted_id})
+            return Category(**created_category)
+        except DuplicateKeyError:
+            # category_id is unique; the caller reports it as a client error
+            raise
+        except Exception as e:
+            logger.error(f"Error creating category: {str(e)}")
+            raise
+
+
+# Global category service instance
+category_service = CategoryService()
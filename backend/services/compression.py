@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from services.config import env_bool, env_int
+import gzip
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Compressed bodies kept per (ETag, encoding), bounded by count and total bytes
+CACHE_ENTRIES = 512
+CACHE_BYTES = 32 * 1024 * 1024
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def supported_encodings() -> List[str]:
+    # In order of preference
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the preferred encoding the client accepts, honouring q=0."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+
+    for encoding in supported_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def vary_on_encoding(response: Response):
+    vary = response.headers.get("vary")
+    if not vary:
+        response.headers["vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        response.headers["vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies, so each distinct cacheable payload is compressed once."""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES, max_bytes: int = CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        body = self._entries.get((etag, encoding))
+        if body is not None:
+            self._entries.move_to_end((etag, encoding))
+        return body
+
+    def put(self, etag: str, encoding: str, body: bytes):
+        key = (etag, encoding)
+        if len(body) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = body
+        self.size += len(body)
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """gzip/brotli negotiation for responses above COMPRESSION_MIN_SIZE bytes.
+
+    Responses that carry an ETag (see services/http_cache.py) are identified by
+    it, so their compressed form is reused until the payload changes.
+    """
+
+    def __init__(self, app, cache: Optional[CompressedBodyCache] = None):
+        super().__init__(app)
+        self.cache = cache or CompressedBodyCache()
+
+    async def dispatch(self, request: Request, call_next):
+        if not env_bool("COMPRESSION_ENABLED", default=True):
+            return await call_next(request)
+
+        encoding = negotiate(request.headers.get("accept-encoding", ""))
+        response = await call_next(request)
+        content_type = response.headers.get("content-type", "")
+        if "content-encoding" in response.headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        # Every variant says so, so shared caches never hand one client's encoding to another
+        vary_on_encoding(response)
+        if encoding is None or request.method == "HEAD" or response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = dict(response.headers)
+        if len(body) < env_int("COMPRESSION_MIN_SIZE", 1024):
+            return Response(content=body, status_code=response.status_code, headers=headers)
+
+        etag = response.headers.get("etag")
+        compressed = self.cache.get(etag, encoding) if etag else None
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if etag:
+                self.cache.put(etag, encoding, compressed)
+
+        headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(compressed))
+        return Response(content=compressed, status_code=response.status_code, headers=headers)
@@ -1,39 +1,194 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
+from pymongo import ReadPreference
+from pymongo.errors import ExecutionTimeout, ServerSelectionTimeoutError, WaitQueueTimeoutError
+from pymongo.monitoring import ConnectionPoolListener
+from services.config import env_bool, env_int
 import os
+import threading
+
+# Failures that mean "busy, try again shortly" rather than a broken request:
+# no pooled connection freed up in time, a read ran past maxTimeMS, or no
+# server could be selected
+OVERLOAD_ERRORS = (WaitQueueTimeoutError, ExecutionTimeout, ServerSelectionTimeoutError)
+
+
+class PoolMonitor(ConnectionPoolListener):
+    """Connection pool occupancy across all servers, from driver pool events.
+
+    Events arrive on driver threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.check_outs = 0
+        self.check_out_timeouts = 0
+        self.check_out_failures = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            if event.reason == "timeout":
+                self.check_out_timeouts += 1
+            else:
+                self.check_out_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.check_outs += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "check_outs": self.check_outs,
+                "check_out_timeouts": self.check_out_timeouts,
+                "check_out_failures": self.check_out_failures
+            }
 
 
 class DatabaseService:
     def __init__(self):
         self.client = None
         self.db = None
+        self.pool_monitor = PoolMonitor()
+        self.client_options: dict = {}
+        # Per-operation server-side limit for reads, in ms; 0 leaves them unbounded
+        self.max_time_ms = 0
+        self.secondary_reads = False
+        self._secondary_collections: dict = {}
+
+    def build_client_options(self) -> dict:
+        """Pool sizing and timeouts from the environment (MONGO_*)."""
+        options = {
+            "maxPoolSize": env_int("MONGO_MAX_POOL_SIZE", 100),
+            "minPoolSize": env_int("MONGO_MIN_POOL_SIZE", 0),
+            # Requests wait this long for a pooled connection, then fail fast
+            # instead of queueing without bound
+            "waitQueueTimeoutMS": env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000),
+            "serverSelectionTimeoutMS": env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        }
+        max_idle_time_ms = env_int("MONGO_MAX_IDLE_TIME_MS", 0)
+        if max_idle_time_ms > 0:
+            options["maxIdleTimeMS"] = max_idle_time_ms
+        return options
 
     async def connect(self):
         mongo_url = os.environ.get('MONGO_URL')
         db_name = os.environ.get('DB_NAME', 'bambugoods')
         
-        self.client = AsyncIOMotorClient(mongo_url)
+        self.client_options = self.build_client_options()
+        self.max_time_ms = env_int("MONGO_MAX_TIME_MS", 0)
+        # Only reads that opt in (secondary=True) go to secondaries, and only
+        # when the deployment accepts slightly stale reads
+        self.secondary_reads = env_bool("MONGO_SECONDARY_READS")
+        self._secondary_collections = {}
+
+        self.client = AsyncIOMotorClient(
+            mongo_url, event_listeners=[self.pool_monitor], **self.client_options
+        )
         self.db = self.client[db_name]
 
     async def disconnect(self):
         if self.client:
             self.client.close()
 
-    async def get_collection(self, collection_name: str):
-        return self.db[collection_name]
+    async def get_collection(self, collection_name: str, secondary: bool = False):
+        if not (secondary and self.secondary_reads):
+            return self.db[collection_name]
+        collection = self._secondary_collections.get(collection_name)
+        if collection is None:
+            collection = self.db[collection_name].with_options(
+                read_preference=ReadPreference.SECONDARY_PREFERRED
+            )
+            self._secondary_collections[collection_name] = collection
+        return collection
+
+    def stats(self) -> dict:
+        return {
+            "pool": self.pool_monitor.stats(),
+            "options": dict(
+                self.client_options,
+                maxTimeMS=self.max_time_ms,
+                secondaryReads=self.secondary_reads
+            )
+        }
 
     async def insert_one(self, collection_name: str, document: dict):
         collection = await self.get_collection(collection_name)
         result = await collection.insert_one(document)
         return result
 
-    async def find_one(self, collection_name: str, filter_dict: dict):
-        collection = await self.get_collection(collection_name)
-        return await collection.find_one(filter_dict)
+    async def find_one(
+        self,
+        collection_name: str,
+        filter_dict: dict,
+        projection: dict = None,
+        secondary: bool = False
+    ):
+        collection = await self.get_collection(collection_name, secondary)
+        if self.max_time_ms:
+            return await collection.find_one(filter_dict, projection, max_time_ms=self.max_time_ms)
+        return await collection.find_one(filter_dict, projection)
 
-    async def find_many(self, collection_name: str, filter_dict: dict = None, limit: int = None, skip: int = None):
-        collection = await self.get_collection(collection_name)
-        cursor = collection.find(filter_dict or {})
+    async def find_many(
+        self,
+        collection_name: str,
+        filter_dict: dict = None,
+        limit: int = None,
+        skip: int = None,
+        projection: dict = None,
+        sort: list = None,
+        secondary: bool = False
+    ):
+        collection = await self.get_collection(collection_name, secondary)
+        cursor = collection.find(filter_dict or {}, projection)
+        if self.max_time_ms:
+            cursor = cursor.max_time_ms(self.max_time_ms)
+        
+        if sort:
+            cursor = cursor.sort(sort)
         
         if skip:
             cursor = cursor.skip(skip)
@@ -42,19 +197,53 @@ class DatabaseService:
             
         return await cursor.to_list(length=limit)
 
+    async def aggregate(self, collection_name: str, pipeline: list, secondary: bool = False):
+        collection = await self.get_collection(collection_name, secondary)
+        options = {"maxTimeMS": self.max_time_ms} if self.max_time_ms else {}
+        return await collection.aggregate(pipeline, **options).to_list(length=None)
+
     async def update_one(self, collection_name: str, filter_dict: dict, update_dict: dict):
         collection = await self.get_collection(collection_name)
         result = await collection.update_one(filter_dict, {"$set": update_dict})
         return result
 
+    async def increment_one(self, collection_name: str, filter_dict: dict, increments: dict):
+        collection = await self.get_collection(collection_name)
+        result = await collection.update_one(filter_dict, {"$inc": increments})
+        return result
+
+    async def upsert_one(self, collection_name: str, filter_dict: dict, update_dict: dict):
+        # update_dict is a full update document, e.g. {"$setOnInsert": {...}}
+        collection = await self.get_collection(collection_name)
+        result = await collection.update_one(filter_dict, update_dict, upsert=True)
+        return result
+
+    async def bulk_write(self, collection_name: str, operations: list, ordered: bool = True):
+        collection = await self.get_collection(collection_name)
+        result = await collection.bulk_write(operations, ordered=ordered)
+        return result
+
     async def delete_one(self, collection_name: str, filter_dict: dict):
         collection = await self.get_collection(collection_name)
         result = await collection.delete_one(filter_dict)
         return result
 
-    async def count_documents(self, collection_name: str, filter_dict: dict = None):
+    async def count_documents(self, collection_name: str, filter_dict: dict = None, secondary: bool = False):
+        collection = await self.get_collection(collection_name, secondary)
+        options = {"maxTimeMS": self.max_time_ms} if self.max_time_ms else {}
+        return await collection.count_documents(filter_dict or {}, **options)
+
+    async def create_index(self, collection_name: str, keys: list, **kwargs):
+        collection = await self.get_collection(collection_name)
+        return await collection.create_index(keys, **kwargs)
+
+    async def drop_index(self, collection_name: str, index_name: str):
+        collection = await self.get_collection(collection_name)
+        await collection.drop_index(index_name)
+
+    async def list_indexes(self, collection_name: str) -> dict:
         collection = await self.get_collection(collection_name)
-        return await collection.count_documents(filter_dict or {})
+        return await collection.index_information()
 
     async def create_text_index(self, collection_name: str, fields: list):
         collection = await self.get_collection(collection_name)
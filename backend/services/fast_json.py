@@ -0,0 +1,53 @@
+from typing import Any
+from datetime import datetime
+from bson import ObjectId
+from pydantic import BaseModel
+from starlette.responses import Response
+from services.config import env_bool
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder below produces the same JSON, slower
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        # Response models name fields by alias (amazonLink), as response_model would
+        return value.model_dump(by_alias=True)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        # orjson writes datetimes itself and calls _default for the rest
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(body: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def fast_responses_enabled() -> bool:
+    return env_bool("FAST_JSON_RESPONSES")
+
+
+class FastJSONResponse(Response):
+    """Serializes service-layer dicts straight to bytes, skipping response_model validation.
+
+    Service output already has the response shape (see the stored localized
+    views), so revalidating it only costs CPU.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,199 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from services.database import db_service
+from services.pagination import Page, decode_cursor, keyset_filter, cursor_after
+from services.product_service import product_service, FAVORITE_COUNT_FIELD
+import logging
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class FavoriteService:
+    def __init__(self):
+        self.collection_name = "favorites"
+        # Most recently saved first; _id breaks ties for the keyset cursor
+        self.listing_sort = [("created_at", -1), ("_id", -1)]
+
+    async def get_favorites(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        expand: bool = False,
+        language: str = "es"
+    ) -> Page:
+        """A page of the user's favorite product IDs.
+
+        With ``expand`` each item is the localized product card instead;
+        favorites whose product is gone or inactive are left out.
+        """
+        after = decode_cursor(cursor, self.listing_sort) if cursor else None
+
+        try:
+            filter_dict = {"user_id": user_id}
+            if after:
+                filter_dict.update(keyset_filter(self.listing_sort, after))
+
+            favorites_data = await db_service.find_many(
+                self.collection_name,
+                filter_dict,
+                limit=limit,
+                projection={"product_id": 1, "created_at": 1},
+                sort=self.listing_sort
+            )
+            next_cursor = cursor_after(self.listing_sort, favorites_data, limit) if limit else None
+
+            product_ids = [str(favorite_data["product_id"]) for favorite_data in favorites_data]
+            if not expand:
+                return Page(product_ids, next_cursor)
+            # One $in (or snapshot lookup) for the whole page, in favorites order
+            return Page(await product_service.get_views_by_ids(product_ids, language), next_cursor)
+        except Exception as e:
+            logger.error(f"Error getting favorites: {str(e)}")
+            raise
+
+    @staticmethod
+    def _insert_if_absent(user_id: str, product_id: ObjectId) -> tuple:
+        # Keyed on the unique (user_id, product_id) index: repeating it is a no-op
+        return (
+            {"user_id": user_id, "product_id": product_id},
+            {"$setOnInsert": {"user_id": user_id, "product_id": product_id, "created_at": datetime.utcnow()}}
+        )
+
+    async def add_favorite(self, user_id: str, product_id: str) -> bool:
+        """Save a favorite in one round trip; False if it was already there."""
+        try:
+            result = await db_service.upsert_one(
+                self.collection_name,
+                *self._insert_if_absent(user_id, ObjectId(product_id))
+            )
+            if result.upserted_id is None:
+                return False
+            await self._adjust_count(product_id, 1)
+            return True
+        except DuplicateKeyError:
+            # A concurrent upsert of the same pair won the race
+            return False
+        except Exception as e:
+            logger.error(f"Error adding favorite: {str(e)}")
+            raise
+
+    async def remove_favorite(self, user_id: str, product_id: str) -> bool:
+        try:
+            result = await db_service.delete_one(
+                self.collection_name,
+                {"user_id": user_id, "product_id": ObjectId(product_id)}
+            )
+            if not result.deleted_count:
+                return False
+            await self._adjust_count(product_id, -1)
+            return True
+        except Exception as e:
+            logger.error(f"Error removing favorite: {str(e)}")
+            raise
+
+    async def apply_bulk(self, user_id: str, add: List[str], remove: List[str]) -> Dict[str, object]:
+        """Apply many adds and removes in one unordered bulk_write.
+
+        An ID listed in both is treated as an add. Malformed IDs are skipped
+        and reported back. The touched products' counters are then recounted
+        rather than adjusted, so concurrent syncs cannot double-count.
+        """
+        add_ids = list(dict.fromkeys(add))
+        adding = set(add_ids)
+        remove_ids = [product_id for product_id in dict.fromkeys(remove) if product_id not in adding]
+        invalid = [product_id for product_id in add_ids + remove_ids if not ObjectId.is_valid(product_id)]
+        valid_adds = [product_id for product_id in add_ids if ObjectId.is_valid(product_id)]
+        valid_removes = [product_id for product_id in remove_ids if ObjectId.is_valid(product_id)]
+
+        operations = [
+            UpdateOne(*self._insert_if_absent(user_id, ObjectId(product_id)), upsert=True)
+            for product_id in valid_adds
+        ] + [
+            DeleteOne({"user_id": user_id, "product_id": ObjectId(product_id)})
+            for product_id in valid_removes
+        ]
+        if not operations:
+            return {"added": 0, "removed": 0, "invalid": invalid}
+
+        try:
+            try:
+                result = await db_service.bulk_write(self.collection_name, operations, ordered=False)
+                added, removed = len(result.upserted_ids), result.deleted_count
+            except BulkWriteError as e:
+                # Lost upsert races are duplicates of rows that now exist; anything else is real
+                if any(error["code"] != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                    raise
+                added, removed = len(e.details.get("upserted", [])), e.details.get("nRemoved", 0)
+
+            if added or removed:
+                await self._recount(valid_adds + valid_removes)
+            return {"added": added, "removed": removed, "invalid": invalid}
+        except Exception as e:
+            logger.error(f"Error applying favorites bulk write: {str(e)}")
+            raise
+
+    async def _count_favorites(self, product_ids: Optional[List[ObjectId]] = None) -> Dict[ObjectId, int]:
+        pipeline = [{"$group": {"_id": "$product_id", "count": {"$sum": 1}}}]
+        if product_ids is not None:
+            pipeline.insert(0, {"$match": {"product_id": {"$in": product_ids}}})
+        return {group["_id"]: group["count"] for group in await db_service.aggregate(self.collection_name, pipeline)}
+
+    async def _recount(self, product_ids: List[str]):
+        object_ids = [ObjectId(product_id) for product_id in product_ids]
+        counts = await self._count_favorites(object_ids)
+        await db_service.bulk_write(
+            product_service.collection_name,
+            [
+                UpdateOne({"_id": object_id}, {"$set": {FAVORITE_COUNT_FIELD: counts.get(object_id, 0)}})
+                for object_id in object_ids
+            ],
+            ordered=False
+        )
+        await product_service.record_counter_change(product_ids)
+
+    async def _adjust_count(self, product_id: str, delta: int):
+        await db_service.increment_one(
+            product_service.collection_name,
+            {"_id": ObjectId(product_id)},
+            {FAVORITE_COUNT_FIELD: delta}
+        )
+        await product_service.record_counter_change([product_id])
+
+    async def reconcile_favorite_counts(self) -> int:
+        """Recount favorites per product and fix any counter that drifted.
+
+        Returns the number of products corrected. Products nobody saved get 0,
+        so every product carries the field the popularity sort pages on.
+        """
+        try:
+            counts = await self._count_favorites()
+            products_data = await db_service.find_many(
+                product_service.collection_name,
+                projection={FAVORITE_COUNT_FIELD: 1}
+            )
+            operations = [
+                UpdateOne(
+                    {"_id": product_data["_id"]},
+                    {"$set": {FAVORITE_COUNT_FIELD: counts.get(product_data["_id"], 0)}}
+                )
+                for product_data in products_data
+                if product_data.get(FAVORITE_COUNT_FIELD) != counts.get(product_data["_id"], 0)
+            ]
+            if operations:
+                await db_service.bulk_write(product_service.collection_name, operations, ordered=False)
+                # Rare, so a full catalog invalidation also refreshes snapshot cards
+                await product_service.record_change(None)
+            return len(operations)
+        except Exception as e:
+            logger.error(f"Error reconciling favorite counts: {str(e)}")
+            raise
+
+
+# Global favorite service instance
+favorite_service = FavoriteService()
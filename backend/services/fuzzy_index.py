@@ -0,0 +1,244 @@
+from typing import Dict, Iterable, Optional, Set
+from services.database import db_service
+from services.localization import SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE
+from services.search_engine import TOKEN_RE, PendingWrites, fold, strip_html
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Words shorter than this are never corrected: too many neighbours to guess right
+MIN_WORD_LENGTH = 3
+
+# Trigram (Dice) similarity a candidate needs before edit distance is computed
+MIN_SIMILARITY = 0.4
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(word: str) -> int:
+    return 1 if len(word) <= 5 else 2
+
+
+def bounded_edit_distance(a: str, b: str, bound: int) -> Optional[int]:
+    """Levenshtein distance between a and b, or None once it exceeds bound."""
+    if abs(len(a) - len(b)) > bound:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > bound:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= bound else None
+
+
+class TrigramIndex:
+    """Vocabulary of folded words with a trigram index for nearest-word lookups.
+
+    Each word keeps the spelling it was first seen with, so a correction can be
+    fed back to accent-sensitive matchers ("bambu" -> "bambú").
+    """
+
+    def __init__(self):
+        self.grams: Dict[str, Set[str]] = {}
+        # folded word -> [document frequency, surface spelling]
+        self.words: Dict[str, list] = {}
+        self.doc_words: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, doc_id: str, texts: Iterable[str]):
+        self.remove(doc_id)
+        surfaces: Dict[str, str] = {}
+        for text in texts:
+            for token in TOKEN_RE.findall(text.casefold()):
+                if len(token) >= MIN_WORD_LENGTH and not token.isdigit():
+                    surfaces.setdefault(fold(token), token)
+
+        for word, surface in surfaces.items():
+            entry = self.words.get(word)
+            if entry is None:
+                self.words[word] = [1, surface]
+                for gram in trigrams(word):
+                    self.grams.setdefault(gram, set()).add(word)
+            else:
+                entry[0] += 1
+        self.doc_words[doc_id] = set(surfaces)
+
+    def remove(self, doc_id: str):
+        for word in self.doc_words.pop(doc_id, ()):
+            entry = self.words[word]
+            entry[0] -= 1
+            if entry[0]:
+                continue
+            del self.words[word]
+            for gram in trigrams(word):
+                words = self.grams.get(gram)
+                if words is not None:
+                    words.discard(word)
+                    if not words:
+                        del self.grams[gram]
+
+    def closest(self, word: str) -> Optional[str]:
+        """Surface spelling of the nearest vocabulary word, or None if nothing is close."""
+        word = fold(word)
+        entry = self.words.get(word)
+        if entry is not None:
+            return entry[1]
+
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        bound = max_edits(word)
+        best = None
+        for candidate, count in shared.items():
+            similarity = 2 * count / (len(grams) + len(candidate))
+            if similarity < MIN_SIMILARITY or abs(len(candidate) - len(word)) > bound:
+                continue
+            distance = bounded_edit_distance(word, candidate, bound)
+            if distance is None:
+                continue
+            rank = (distance, -similarity, -self.words[candidate][0], candidate)
+            if best is None or rank < best[0]:
+                best = (rank, candidate)
+        return self.words[best[1]][1] if best else None
+
+    def correct(self, query: str) -> Optional[str]:
+        """Rewrite each word of the query to its closest vocabulary word.
+
+        Returns None when no word changes, so callers can skip a pointless retry.
+        """
+        def replace(match):
+            token = match.group(0)
+            if len(token) < MIN_WORD_LENGTH or token.isdigit():
+                return token
+            return self.closest(token) or token
+
+        corrected = TOKEN_RE.sub(replace, query)
+        return corrected if corrected.casefold() != query.casefold() else None
+
+
+class FuzzyIndex:
+    """Per-language spelling correction over product and article text.
+
+    Searches that come back empty are retried once with the corrected query.
+    """
+
+    def __init__(self):
+        self.products: Dict[str, TrigramIndex] = self._new_indexes()
+        self.articles: Dict[str, TrigramIndex] = self._new_indexes()
+        self.ready = False
+        self._build_lock = asyncio.Lock()
+        self._pending = PendingWrites()
+
+    @staticmethod
+    def _new_indexes() -> Dict[str, TrigramIndex]:
+        return {language: TrigramIndex() for language in SUPPORTED_LANGUAGES}
+
+    def index_product(self, product_data: dict, indexes: Optional[Dict[str, TrigramIndex]] = None):
+        if indexes is None:
+            self._pending.record("products", self.index_product, product_data)
+            indexes = self.products
+        doc_id = str(product_data["_id"])
+        for language, index in indexes.items():
+            if not product_data.get("is_active", True):
+                index.remove(doc_id)
+                continue
+            index.add(doc_id, [
+                product_data["name"][language],
+                product_data["description"][language],
+                *product_data.get("features", {}).get(language, [])
+            ])
+
+    def remove_product(self, product_id: str, indexes: Optional[Dict[str, TrigramIndex]] = None):
+        if indexes is None:
+            self._pending.record("products", self.remove_product, product_id)
+            indexes = self.products
+        for index in indexes.values():
+            index.remove(product_id)
+
+    def index_article(self, article_data: dict, indexes: Optional[Dict[str, TrigramIndex]] = None):
+        if indexes is None:
+            self._pending.record("articles", self.index_article, article_data)
+            indexes = self.articles
+        doc_id = str(article_data["_id"])
+        for language, index in indexes.items():
+            if not article_data.get("is_published", True):
+                index.remove(doc_id)
+                continue
+            index.add(doc_id, [
+                article_data["title"][language],
+                article_data["excerpt"][language],
+                strip_html(article_data["content"][language]),
+                *article_data.get("tags", [])
+            ])
+
+    async def build(self):
+        try:
+            with self._pending.collecting():
+                products = self._new_indexes()
+                articles = self._new_indexes()
+
+                products_data = await db_service.find_many(
+                    "products",
+                    {"is_active": True},
+                    projection={"name": 1, "description": 1, "features": 1, "is_active": 1}
+                )
+                for product_data in products_data:
+                    self.index_product(product_data, products)
+
+                articles_data = await db_service.find_many(
+                    "articles",
+                    {"is_published": True},
+                    projection={"title": 1, "excerpt": 1, "content": 1, "tags": 1, "is_published": 1}
+                )
+                for article_data in articles_data:
+                    self.index_article(article_data, articles)
+
+                self._pending.replay({"products": products, "articles": articles})
+
+            self.products = products
+            self.articles = articles
+            self.ready = True
+            logger.info(
+                f"Fuzzy index built with {len(products[DEFAULT_LANGUAGE])} product words and "
+                f"{len(articles[DEFAULT_LANGUAGE])} article words"
+            )
+        except Exception as e:
+            logger.error(f"Error building fuzzy index: {str(e)}")
+            raise
+
+    async def ensure_ready(self):
+        if self.ready:
+            return
+        async with self._build_lock:
+            if not self.ready:
+                await self.build()
+
+    async def correct_product_query(self, query: str, language: str) -> Optional[str]:
+        await self.ensure_ready()
+        index = self.products.get(language) or self.products[DEFAULT_LANGUAGE]
+        return index.correct(query)
+
+    async def correct_article_query(self, query: str, language: str) -> Optional[str]:
+        await self.ensure_ready()
+        index = self.articles.get(language) or self.articles[DEFAULT_LANGUAGE]
+        return index.correct(query)
+
+
+# Global fuzzy index instance
+fuzzy_index = FuzzyIndex()
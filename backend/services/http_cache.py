@@ -0,0 +1,162 @@
+from typing import Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from services.config import env_bool, env_int
+import hashlib
+import re
+import uuid
+
+# Route groups that get validators and Cache-Control, matched on the request path
+ROUTE_GROUPS = [
+    ("products", re.compile(r"^/api/products(/facets)?$")),
+    ("categories", re.compile(r"^/api/categories$")),
+    ("articles", re.compile(r"^/api/articles$")),
+    ("article", re.compile(r"^/api/articles/[^/]+$")),
+]
+
+# Default (max-age, stale-while-revalidate) in seconds per group; override with
+# HTTP_CACHE_<GROUP>_MAX_AGE and HTTP_CACHE_<GROUP>_SWR
+CACHE_DEFAULTS: Dict[str, Tuple[int, int]] = {
+    "products": (60, 300),
+    "categories": (300, 3600),
+    "articles": (120, 600),
+    "article": (300, 3600),
+}
+
+# Version-based ETags embed this so a restarted process (whose in-memory
+# versions start over) never validates a tag issued by its predecessor
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def route_group(path: str) -> Optional[str]:
+    for group, pattern in ROUTE_GROUPS:
+        if pattern.match(path):
+            return group
+    return None
+
+
+def cache_control(group: str) -> str:
+    max_age, stale = CACHE_DEFAULTS[group]
+    max_age = env_int(f"HTTP_CACHE_{group.upper()}_MAX_AGE", max_age)
+    stale = env_int(f"HTTP_CACHE_{group.upper()}_SWR", stale)
+    return f"public, max-age={max_age}, stale-while-revalidate={stale}"
+
+
+def body_etag(body: bytes) -> str:
+    # Weak: compressed and identity encodings of the same body share the tag
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def version_etag(*parts) -> str:
+    key = ":".join(str(part) for part in (BOOT_ID,) + parts)
+    return f'W/"v-{hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def http_date(moment: datetime) -> str:
+    # HTTP dates have whole seconds; round up so a change is never dated earlier
+    if moment.microsecond:
+        moment = moment.replace(microsecond=0) + timedelta(seconds=1)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    wanted = etag.removeprefix("W/")
+    return any(
+        candidate.strip() == "*" or candidate.strip().removeprefix("W/") == wanted
+        for candidate in header.split(",")
+    )
+
+
+def not_modified_since(request: Request, last_modified: Optional[str]) -> bool:
+    # Only consulted for responses without an ETag and requests without If-None-Match
+    header = request.headers.get("if-modified-since")
+    if not header or not last_modified or "if-none-match" in request.headers:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+
+
+def is_fresh(request: Request, etag: Optional[str], last_modified: Optional[str] = None) -> bool:
+    """Whether the client's copy is current.
+
+    The ETag, when there is one, decides alone (RFC 9110 section 13.2.2):
+    Last-Modified comes from a per-process clock with one second resolution,
+    so If-Modified-Since could validate a copy another worker has outdated.
+    """
+    if etag:
+        return etag_matches(request, etag)
+    return not_modified_since(request, last_modified)
+
+
+def not_modified(group: str, etag: str, last_modified: Optional[str] = None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control(group)}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[str] = None
+) -> Optional[Response]:
+    """Validators for an endpoint that names its version before doing any work.
+
+    Returns the 304 to send when the client's copy is current; otherwise sets
+    ETag and Last-Modified on ``response`` and returns None. A no-op when
+    HTTP_CACHE_ENABLED is false.
+    """
+    if not env_bool("HTTP_CACHE_ENABLED", default=True):
+        return None
+    if is_fresh(request, etag, last_modified):
+        return not_modified(route_group(request.url.path), etag, last_modified)
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = last_modified
+    return None
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """ETag, Cache-Control and 304 handling for the cacheable GET routes.
+
+    Endpoints that can name their version cheaply set ETag themselves and
+    answer 304 before touching Mongo; for the rest the ETag is a hash of the
+    rendered body, which still saves the transfer.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        group = route_group(request.url.path) if request.method in ("GET", "HEAD") else None
+        if group is None or not env_bool("HTTP_CACHE_ENABLED", default=True):
+            return await call_next(request)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = response.headers.get("etag") or body_etag(body)
+        last_modified = response.headers.get("last-modified")
+        if is_fresh(request, etag, last_modified):
+            return not_modified(group, etag, last_modified)
+
+        headers = dict(response.headers)
+        headers["etag"] = etag
+        headers["cache-control"] = cache_control(group)
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=headers,
+            media_type=response.media_type
+        )
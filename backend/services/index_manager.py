@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Tuple
+from models.indexes import INDEXES, IndexSpec
+from services.database import db_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IndexReport:
+    def __init__(self):
+        self.present: List[IndexSpec] = []
+        self.created: List[IndexSpec] = []
+        self.missing: List[IndexSpec] = []
+        self.failed: List[Tuple[IndexSpec, str]] = []
+        # (collection, index name, reason)
+        self.drift: List[Tuple[str, str, str]] = []
+
+    @property
+    def clean(self) -> bool:
+        return not (self.missing or self.failed or self.drift)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.present)} present, {len(self.created)} created, "
+            f"{len(self.missing)} missing, {len(self.failed)} failed, {len(self.drift)} drifted"
+        )
+
+
+def _normalize_direction(direction):
+    return int(direction) if isinstance(direction, (int, float)) else direction
+
+
+def spec_signature(spec: IndexSpec) -> tuple:
+    # Mongo stores text indexes as (_fts, _ftsx) plus a weights map, so text
+    # indexes are compared by the set of fields they cover.
+    if spec.is_text:
+        return ("text", frozenset(field for field, _ in spec.keys))
+    return tuple((field, _normalize_direction(direction)) for field, direction in spec.keys)
+
+
+def existing_signature(info: dict) -> tuple:
+    if "weights" in info:
+        return ("text", frozenset(info["weights"]))
+    if any(direction == "text" for _, direction in info["key"]):
+        return ("text", frozenset(field for field, direction in info["key"] if direction == "text"))
+    return tuple((field, _normalize_direction(direction)) for field, direction in info["key"])
+
+
+def _options_match(spec: IndexSpec, info: dict) -> bool:
+    if bool(info.get("unique", False)) != spec.unique:
+        return False
+    return all(info.get(option) == value for option, value in spec.options.items())
+
+
+class IndexManager:
+    def __init__(self, indexes: List[IndexSpec] = None):
+        self.indexes = indexes if indexes is not None else INDEXES
+
+    def specs_by_collection(self) -> Dict[str, List[IndexSpec]]:
+        collections: Dict[str, List[IndexSpec]] = {}
+        for spec in self.indexes:
+            collections.setdefault(spec.collection, []).append(spec)
+        return collections
+
+    async def reconcile(
+        self,
+        dry_run: bool = False,
+        collections: Optional[List[str]] = None,
+        replace_drifted: bool = False
+    ) -> IndexReport:
+        """Create missing registry indexes and report drift.
+
+        Indexes whose definition no longer matches the registry are only
+        reported unless ``replace_drifted`` is set, in which case they are
+        dropped and rebuilt from the registry. Indexes the registry does not
+        know about are never touched.
+        """
+        report = IndexReport()
+
+        for collection_name, specs in self.specs_by_collection().items():
+            if collections and collection_name not in collections:
+                continue
+
+            existing = await db_service.list_indexes(collection_name)
+            by_signature = {existing_signature(info): name for name, info in existing.items()}
+            matched = {"_id_"}
+
+            for spec in specs:
+                signature = spec_signature(spec)
+                existing_name = by_signature.get(signature)
+                conflict = None
+
+                if existing_name is not None:
+                    matched.add(existing_name)
+                    if _options_match(spec, existing[existing_name]):
+                        report.present.append(spec)
+                        continue
+                    conflict = (existing_name, f"options differ from {spec.name}")
+                elif spec.name in existing:
+                    matched.add(spec.name)
+                    conflict = (spec.name, "name in use with different keys")
+                elif spec.is_text:
+                    other_text = [name for name, info in existing.items() if existing_signature(info)[0] == "text"]
+                    if other_text:
+                        matched.update(other_text)
+                        conflict = (other_text[0], f"text index differs from {spec.name}")
+
+                if conflict is not None and not (replace_drifted and not dry_run):
+                    report.drift.append((collection_name,) + conflict)
+                    continue
+
+                if dry_run:
+                    report.missing.append(spec)
+                    continue
+
+                try:
+                    if conflict is not None:
+                        await db_service.drop_index(collection_name, conflict[0])
+                        logger.info(f"Dropped drifted index {collection_name}.{conflict[0]}")
+                    await db_service.create_index(
+                        collection_name,
+                        spec.keys,
+                        name=spec.name,
+                        unique=spec.unique,
+                        background=True,
+                        **spec.options
+                    )
+                    report.created.append(spec)
+                    logger.info(f"Created index {collection_name}.{spec.name}")
+                except Exception as e:
+                    report.failed.append((spec, str(e)))
+                    logger.error(f"Error creating index {collection_name}.{spec.name}: {str(e)}")
+
+            for name in existing:
+                if name not in matched:
+                    report.drift.append((collection_name, name, "not in registry"))
+
+        for collection_name, name, reason in report.drift:
+            logger.warning(f"Index drift on {collection_name}.{name}: {reason}")
+
+        return report
+
+
+# Global index manager instance
+index_manager = IndexManager()
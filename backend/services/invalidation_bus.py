@@ -0,0 +1,228 @@
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from services.database import db_service
+from services.config import env_int
+import asyncio
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "invalidation_events"
+
+# Capped transport: bytes kept in the capped collection
+CAPPED_BYTES = 1024 * 1024
+# Change stream transport: events are only needed while workers catch up
+EVENTS_TTL_SECONDS = 24 * 3600
+# Pause before a transport that failed or ran dry is reopened
+RETRY_SECONDS = 1.0
+
+
+class LocalTransport:
+    """In-process stand-in: every bus sharing a transport sees every event.
+
+    Enough for a single worker, and lets tests run several buses as if they
+    were separate workers.
+    """
+
+    def __init__(self):
+        self._queues: List[asyncio.Queue] = []
+
+    async def start(self):
+        pass
+
+    async def send(self, event: dict):
+        for queue in self._queues:
+            queue.put_nowait(event)
+
+    async def events(self) -> AsyncIterator[dict]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+
+class CappedCollectionTransport:
+    """Events in a capped collection, followed with a tailable cursor.
+
+    Works on standalone servers; INVALIDATION_BUS_CAPPED_BYTES sizes the
+    collection, which only needs to hold the events workers have not read yet.
+    """
+
+    def __init__(self):
+        # Kept across listener restarts, so a reconnect resumes where it stopped
+        self._last_id = None
+        self._positioned = False
+
+    async def start(self):
+        try:
+            await db_service.db.create_collection(
+                EVENTS_COLLECTION,
+                capped=True,
+                size=env_int("INVALIDATION_BUS_CAPPED_BYTES", CAPPED_BYTES)
+            )
+        except CollectionInvalid:
+            pass
+
+    async def send(self, event: dict):
+        await db_service.insert_one(EVENTS_COLLECTION, dict(event, created_at=datetime.utcnow()))
+
+    async def events(self) -> AsyncIterator[dict]:
+        collection = await db_service.get_collection(EVENTS_COLLECTION)
+        if not self._positioned:
+            # Only events published after this worker started
+            latest = await collection.find_one({}, sort=[("$natural", -1)], projection={"_id": 1})
+            self._last_id = latest["_id"] if latest else None
+            self._positioned = True
+        while True:
+            # ObjectIds from different processes are not ordered like the inserts,
+            # so a reopened cursor replays the collection in natural (insertion)
+            # order and skips up to the last event seen, instead of filtering on _id
+            skipping = self._last_id is not None
+            checked = not skipping
+            cursor = collection.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+            while cursor.alive:
+                async for event in cursor:
+                    if not checked:
+                        # Asked once the cursor holds a position: the cap removes the
+                        # oldest events first, so the last one read can only roll off
+                        # after that position does, which kills the cursor
+                        checked = True
+                        if event["_id"] != self._last_id and not await collection.count_documents(
+                            {"_id": self._last_id}, limit=1
+                        ):
+                            # Rolled off the cap: everything still there came after it
+                            logger.warning("Invalidation events were dropped before this worker read them")
+                            skipping = False
+                    if skipping:
+                        skipping = event["_id"] != self._last_id
+                        continue
+                    self._last_id = event["_id"]
+                    yield event
+            # A tailable cursor dies at once on an empty collection
+            await asyncio.sleep(RETRY_SECONDS)
+
+
+class ChangeStreamTransport:
+    """Events inserted into a collection and followed with a change stream.
+
+    Needs a replica set or sharded cluster. Events expire after a day.
+    """
+
+    def __init__(self):
+        self._resume_token = None
+
+    async def start(self):
+        collection = await db_service.get_collection(EVENTS_COLLECTION)
+        await collection.create_index(
+            "created_at", name="invalidation_events_ttl", expireAfterSeconds=EVENTS_TTL_SECONDS
+        )
+
+    async def send(self, event: dict):
+        await db_service.insert_one(EVENTS_COLLECTION, dict(event, created_at=datetime.utcnow()))
+
+    async def events(self) -> AsyncIterator[dict]:
+        collection = await db_service.get_collection(EVENTS_COLLECTION)
+        async with collection.watch(
+            [{"$match": {"operationType": "insert"}}],
+            resume_after=self._resume_token
+        ) as stream:
+            async for change in stream:
+                # Reconnects pick up where this stream left off
+                self._resume_token = change["_id"]
+                yield change["fullDocument"]
+
+
+TRANSPORTS = {
+    "local": LocalTransport,
+    "capped": CappedCollectionTransport,
+    "change_stream": ChangeStreamTransport,
+}
+
+
+class InvalidationBus:
+    """Carries cache invalidations from the worker that wrote to all the others.
+
+    Writers update their own caches directly and publish an event; every
+    worker's listener hands events from other workers to the handlers
+    registered for their kind. INVALIDATION_BUS picks the transport: local
+    (default, this process only), capped or change_stream.
+    """
+
+    def __init__(self, transport=None):
+        self.origin = uuid.uuid4().hex
+        self.transport = transport
+        self._handlers: Dict[str, List[Callable[[dict], Awaitable[None]]]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    def on(self, kind: str, handler: Callable[[dict], Awaitable[None]]):
+        handlers = self._handlers.setdefault(kind, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    async def start(self):
+        if self.transport is None:
+            name = os.environ.get("INVALIDATION_BUS", "").strip() or "local"
+            self.transport = TRANSPORTS[name]()
+        await self.transport.start()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def publish(self, kind: str, **payload):
+        if self.transport is None:
+            return
+        try:
+            await self.transport.send(dict(payload, kind=kind, origin=self.origin))
+            self.published += 1
+        except Exception as e:
+            # The write itself succeeded; other workers catch up when their caches expire
+            self.errors += 1
+            logger.error(f"Error publishing {kind} invalidation: {str(e)}")
+
+    async def dispatch(self, event: dict):
+        if event.get("origin") == self.origin:
+            return
+        self.received += 1
+        for handler in self._handlers.get(event.get("kind"), []):
+            try:
+                await handler(event)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error applying {event.get('kind')} invalidation: {str(e)}")
+
+    async def _listen(self):
+        while True:
+            try:
+                async for event in self.transport.events():
+                    await self.dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Invalidation bus listener failed: {str(e)}")
+            await asyncio.sleep(RETRY_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "transport": type(self.transport).__name__ if self.transport else None,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors
+        }
+
+
+# Global invalidation bus instance
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,22 @@
+from typing import Optional
+
+SUPPORTED_LANGUAGES = ("es", "en")
+DEFAULT_LANGUAGE = "es"
+
+# Documents carry their per-language response payloads under this key. They are
+# built when the document is written so read paths can return them as-is.
+LOCALIZED_FIELD = "localized"
+
+# Per-language copies of the searchable text, each tagged with the language
+# Mongo's $text analyzer should use (see the text indexes in models/indexes.py)
+SEARCH_TEXT_FIELD = "search_text"
+TEXT_LANGUAGE_FIELD = "language"
+TEXT_SEARCH_LANGUAGES = {"es": "spanish", "en": "english"}
+
+
+def localized_view(document: dict, language: str) -> Optional[dict]:
+    """Return the stored response payload for ``language``, if the document has one."""
+    views = document.get(LOCALIZED_FIELD)
+    if not views:
+        return None
+    return views.get(language)
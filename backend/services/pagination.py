@@ -0,0 +1,82 @@
+from typing import Any, List, NamedTuple, Optional, Tuple
+from bson import json_util
+import base64
+import json
+
+# A sort specification as passed to Mongo: [(field, 1 | -1), ...]. Keyset
+# pagination needs the last key to be unique, so every spec ends with "_id".
+SortSpec = List[Tuple[str, int]]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page(NamedTuple):
+    items: List[dict]
+    next_cursor: Optional[str] = None
+    # Set when an empty search was retried with a spelling-corrected query
+    corrected_query: Optional[str] = None
+
+
+def encode_cursor(sort: SortSpec, values: List[Any]) -> str:
+    """Build an opaque cursor pointing just after the row with these sort values."""
+    payload = json_util.dumps({"k": [field for field, _ in sort], "v": values})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: SortSpec) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise InvalidCursor("Malformed cursor")
+
+    if not isinstance(payload, dict) or payload.get("k") != [field for field, _ in sort]:
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise InvalidCursor("Malformed cursor")
+    return values
+
+
+def keyset_filter(sort: SortSpec, values: List[Any]) -> dict:
+    """Filter selecting rows strictly after ``values`` in ``sort`` order.
+
+    For a sort on (a desc, _id desc) this yields
+    {"$or": [{"a": {"$lt": va}}, {"a": va, "_id": {"$lt": vid}}]}.
+    Missing and null keys sort first ascending and last descending, as Mongo
+    orders them, so rows without the field are neither skipped nor repeated.
+    """
+    clauses = []
+    for position, (field, direction) in enumerate(sort):
+        clause = {prefix_field: values[i] for i, (prefix_field, _) in enumerate(sort[:position])}
+        value = values[position]
+        if direction > 0:
+            clause[field] = {"$ne": None} if value is None else {"$gt": value}
+        elif value is None:
+            # Nothing sorts after null in descending order
+            continue
+        elif field == "_id":
+            clause[field] = {"$lt": value}
+        else:
+            clause["$or"] = [{field: {"$lt": value}}, {field: None}]
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def sort_values(sort: SortSpec, document: dict) -> List[Any]:
+    values = []
+    for field, _ in sort:
+        value = document
+        for part in field.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        values.append(value)
+    return values
+
+
+def cursor_after(sort: SortSpec, documents: List[dict], limit: int) -> Optional[str]:
+    """Cursor for the page following ``documents``, or None on the last page."""
+    if not documents or len(documents) < limit:
+        return None
+    return encode_cursor(sort, sort_values(sort, documents[-1]))
@@ -1,20 +1,497 @@
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
 from bson import ObjectId
-from models.product import Product, ProductCreate, ProductUpdate, ProductResponse
+from models.product import Product, ProductCreate, ProductUpdate
 from services.database import db_service
+from services.catalog_snapshot import (
+    CatalogSnapshot, MappedCatalogSnapshot, snapshot_file_identity, write_snapshot_file
+)
+from services.config import env_bool
+from services.localization import (
+    SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE, LOCALIZED_FIELD, SEARCH_TEXT_FIELD, TEXT_LANGUAGE_FIELD,
+    TEXT_SEARCH_LANGUAGES, localized_view
+)
+from services.pagination import Page, InvalidCursor, encode_cursor, decode_cursor, keyset_filter, cursor_after
+from services.search_engine import search_engine
+from services.fuzzy_index import fuzzy_index
+from services.search_indexes import search_indexes
+from services.single_flight import single_flight, invalidate_flights
+from services.query_cache import cached, query_cache
+from services.invalidation_bus import invalidation_bus
+import asyncio
 import logging
+import os
+import re
 
 logger = logging.getLogger(__name__)
 
+# Percentage off original_price, stored at write time so it can be filtered and sorted on
+DISCOUNT_FIELD = "discount"
+
+# How many users saved the product; kept current by every write of the favorites
+# service and corrected periodically by FavoriteService.reconcile_favorite_counts
+FAVORITE_COUNT_FIELD = "favorite_count"
+# Query cache tag of listings sorted by favorite_count, which any favorite reorders
+POPULAR_LISTINGS_TAG = "products:popular"
+
+# Lower bounds of the facet buckets; the last bucket is open-ended
+PRICE_BUCKETS = [0, 10, 25, 50, 100]
+RATING_BUCKETS = [0, 3, 4, 4.5]
+
+# Distinct filter combinations whose facet counts are kept
+FACET_CACHE_SIZE = 256
+
+
+class RangeFilters(NamedTuple):
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_rating: Optional[float] = None
+    min_discount: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        return any(value is not None for value in self)
+
+    def query(self) -> dict:
+        filter_dict = {}
+        price = {}
+        if self.min_price is not None:
+            price["$gte"] = self.min_price
+        if self.max_price is not None:
+            price["$lte"] = self.max_price
+        if price:
+            filter_dict["price"] = price
+        if self.min_rating is not None:
+            filter_dict["rating"] = {"$gte": self.min_rating}
+        if self.min_discount is not None:
+            filter_dict[DISCOUNT_FIELD] = {"$gte": self.min_discount}
+        return filter_dict
+
+
+class FacetedPage(NamedTuple):
+    items: List[dict]
+    next_cursor: Optional[str]
+    total: int
+    facets: dict
+
+
+def bucket_facets(counts: Dict[float, int], boundaries: List[float]) -> List[dict]:
+    """Turn {bucket lower bound: count} into the facet list, empty buckets included."""
+    return [
+        {
+            "min": lower,
+            "max": boundaries[position + 1] if position + 1 < len(boundaries) else None,
+            "count": counts.get(lower, 0)
+        }
+        for position, lower in enumerate(boundaries)
+    ]
+
+
+def bucket_of(value: float, boundaries: List[float]) -> float:
+    return boundaries[max(bisect_right(boundaries, value) - 1, 0)]
+
+
+def category_facets(counts: Dict[str, int]) -> List[dict]:
+    return [
+        {"value": value, "count": count}
+        for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+def listing_tags(arguments: dict, page: Page) -> List[str]:
+    """What a product listing depends on, for query cache invalidation."""
+    tags = [f"product:{item['id']}" for item in page.items]
+    tags.append(f"category:{arguments['category']}" if arguments["category"] else "products:all")
+    if arguments["search"]:
+        tags.append("products:search")
+    if arguments["sort"] == "popular":
+        tags.append(POPULAR_LISTINGS_TAG)
+    return tags
+
 
 class ProductService:
     def __init__(self):
         self.collection_name = "products"
+        # Every sort ends with _id so it can back a keyset cursor; each one has
+        # matching compound indexes in models/indexes.py
+        self.default_sort = "default"
+        self.sorts = {
+            "default": [("_id", 1)],
+            "price-asc": [("price", 1), ("_id", 1)],
+            "price-desc": [("price", -1), ("_id", -1)],
+            "rating": [("rating", -1), ("_id", -1)],
+            "reviews": [("reviews", -1), ("_id", -1)],
+            "discount": [(DISCOUNT_FIELD, -1), ("_id", -1)],
+            "popular": [(FAVORITE_COUNT_FIELD, -1), ("_id", -1)]
+        }
+        # Listings follow insertion order by default; snapshots are held in this order
+        self.listing_sort = self.sorts[self.default_sort]
+        self.catalog_version = 0
+        self.catalog_changed_at = datetime.utcnow()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._snapshot_lock = asyncio.Lock()
+        # (catalog version, language, category, search, ranges) -> (total, facets)
+        self._facet_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    @property
+    def snapshot_enabled(self) -> bool:
+        return env_bool("CATALOG_SNAPSHOT_ENABLED")
+
+    @property
+    def snapshot_file(self) -> Optional[str]:
+        """Shared snapshot file mapped by every worker, instead of a per-process copy."""
+        return os.environ.get("CATALOG_SNAPSHOT_FILE") or None
+
+    @property
+    def search_engine_enabled(self) -> bool:
+        return env_bool("SEARCH_ENGINE_ENABLED")
+
+    def bump_catalog_version(self, *tags: str):
+        """Record a catalog write; ``tags`` name what changed, none means everything."""
+        self.catalog_version += 1
+        self.catalog_changed_at = datetime.utcnow()
+        invalidate_flights("products.")
+        if tags:
+            query_cache.invalidate(*tags)
+        else:
+            query_cache.clear("products.")
+
+    async def record_change(self, product_id: Optional[str], *tags: str):
+        """Invalidate this worker's catalog caches and tell the other workers."""
+        self.bump_catalog_version(*tags)
+        if self.snapshot_enabled and self.snapshot_file:
+            try:
+                await self.publish_snapshot_file()
+            except Exception as e:
+                # Workers keep the previous file until the next publish succeeds
+                logger.error(f"Error publishing catalog snapshot file: {str(e)}")
+        await invalidation_bus.publish("products", product_id=product_id, tags=list(tags))
+
+    async def apply_change(self, event: dict):
+        """Bring this worker's caches and indexes up to date with another worker's write."""
+        self.bump_catalog_version(*event["tags"])
+        product_id = event.get("product_id")
+        if not product_id:
+            return
+        product_data = await db_service.find_one(self.collection_name, {"_id": ObjectId(product_id)})
+        if product_data:
+            search_indexes.index_product(product_data)
+        else:
+            search_indexes.remove_product(product_id)
+
+    def invalidate_counters(self, product_ids: List[str]):
+        """Drop cached results that show the favorite counts of ``product_ids``.
+
+        Counters change on every click, so they leave catalog_version, the
+        snapshot and the version ETags alone: snapshot cards catch up with
+        the next catalog write.
+        """
+        invalidate_flights("products.")
+        query_cache.invalidate(*[f"product:{product_id}" for product_id in product_ids], POPULAR_LISTINGS_TAG)
+
+    async def record_counter_change(self, product_ids: List[str]):
+        """Invalidate this worker's counter-dependent results and tell the other workers."""
+        self.invalidate_counters(product_ids)
+        await invalidation_bus.publish("product_counters", product_ids=list(product_ids))
+
+    async def apply_counter_change(self, event: dict):
+        self.invalidate_counters(event["product_ids"])
+
+    def write_tags(self, product_id: str, *categories: Optional[str]) -> List[str]:
+        # Unfiltered listings and searches can change with any product
+        tags = [f"product:{product_id}", "products:all", "products:search"]
+        return tags + [f"category:{category}" for category in categories if category]
+
+    def serves_from_snapshot(
+        self,
+        language: str,
+        search: Optional[str],
+        ranges: RangeFilters = RangeFilters(),
+        sort: Optional[str] = None
+    ) -> bool:
+        """Whether a listing is answered from the snapshot, and so fixed by catalog_version."""
+        if not (
+            self.snapshot_enabled
+            and language in SUPPORTED_LANGUAGES
+            and not search
+            and not ranges.active
+            and (sort or self.default_sort) == self.default_sort
+        ):
+            return False
+        # catalog_version must account for a snapshot file swapped in by another process
+        self.sync_snapshot_file()
+        return True
+
+    def localize(self, product: Product, language: str) -> dict:
+        return {
+            "id": str(product.id),
+            "name": product.name.dict()[language],
+            "description": product.description.dict()[language],
+            "category": product.category,
+            "price": product.price,
+            "originalPrice": product.original_price,
+            "image": product.image,
+            "amazonLink": product.amazon_link,
+            "rating": product.rating,
+            "reviews": product.reviews,
+            "features": product.features.get(language, []),
+            "discount": self.discount(product.price, product.original_price),
+            "isActive": product.is_active,
+            "createdAt": product.created_at,
+            "updatedAt": product.updated_at
+        }
+
+    @staticmethod
+    def discount(price: float, original_price: float) -> float:
+        if not original_price or price >= original_price:
+            return 0.0
+        return round((original_price - price) / original_price * 100, 1)
+
+    def build_localized_views(self, product: Product) -> Dict[str, dict]:
+        return {language: self.localize(product, language) for language in SUPPORTED_LANGUAGES}
+
+    def build_search_text(self, product: Product) -> Dict[str, dict]:
+        return {
+            language: {
+                TEXT_LANGUAGE_FIELD: TEXT_SEARCH_LANGUAGES[language],
+                "name": product.name.dict()[language],
+                "description": product.description.dict()[language],
+                "features": product.features.get(language, [])
+            }
+            for language in SUPPORTED_LANGUAGES
+        }
+
+    def derived_fields(self, product: Product) -> dict:
+        """Fields computed from the product at write time so reads can use them as-is."""
+        return {
+            LOCALIZED_FIELD: self.build_localized_views(product),
+            SEARCH_TEXT_FIELD: self.build_search_text(product),
+            DISCOUNT_FIELD: self.discount(product.price, product.original_price)
+        }
+
+    def listing_projection(self, language: str) -> dict:
+        """Only the stored view for ``language`` plus the fields sorts and cursors read."""
+        projection = {f"{LOCALIZED_FIELD}.{language}": 1, FAVORITE_COUNT_FIELD: 1}
+        for sort_spec in self.sorts.values():
+            projection.update({field: 1 for field, _ in sort_spec})
+        return projection
+
+    async def with_legacy_documents(self, products_data: List[dict], language: str) -> List[dict]:
+        """Reload in full the listed documents written before stored views existed.
+
+        Listing reads project the stored view only, and localizing on the fly
+        needs the whole product.
+        """
+        legacy_ids = [
+            product_data["_id"] for product_data in products_data
+            if localized_view(product_data, language) is None
+        ]
+        if not legacy_ids:
+            return products_data
+        full = {
+            product_data["_id"]: product_data
+            for product_data in await db_service.find_many(self.collection_name, {"_id": {"$in": legacy_ids}})
+        }
+        return [
+            dict(full[product_data["_id"]], **product_data) if product_data["_id"] in full else product_data
+            for product_data in products_data
+        ]
+
+    def build_filter(
+        self,
+        category: Optional[str],
+        language: str,
+        search: Optional[str],
+        ranges: RangeFilters = RangeFilters()
+    ) -> dict:
+        """Mongo filter for listings, counts and facets, so they always agree."""
+        filter_dict = {"is_active": True}
+
+        if category:
+            filter_dict["category"] = category
+
+        filter_dict.update(ranges.query())
+
+        if search:
+            # Substring fallback; user input is matched literally, never run as a regex
+            pattern = re.escape(search)
+            filter_dict["$or"] = [
+                {f"name.{language}": {"$regex": pattern, "$options": "i"}},
+                {f"description.{language}": {"$regex": pattern, "$options": "i"}},
+                {f"features.{language}": {"$regex": pattern, "$options": "i"}}
+            ]
+        return filter_dict
+
+    def next_cursor(self, products: List[dict], limit: int) -> Optional[str]:
+        if len(products) < limit:
+            return None
+        return encode_cursor(self.listing_sort, [ObjectId(products[-1]["id"])])
+
+    def view_for(self, product_data: dict, language: str) -> dict:
+        view = localized_view(product_data, language)
+        if view is None:
+            # Documents written before views existed are localized on the fly
+            view = self.localize(Product(**product_data), language)
+        if FAVORITE_COUNT_FIELD in product_data:
+            # Counters change on every favorite, so they are not baked into the stored views
+            view = dict(view, favoriteCount=product_data[FAVORITE_COUNT_FIELD])
+        return view
+
+    async def refresh_derived_fields(self, product_id: ObjectId) -> Optional[dict]:
+        product_data = await db_service.find_one(self.collection_name, {"_id": product_id})
+        if product_data:
+            derived = self.derived_fields(Product(**product_data))
+            await db_service.update_one(self.collection_name, {"_id": product_id}, derived)
+            product_data.update(derived)
+        return product_data
+
+    async def backfill_derived_fields(self) -> int:
+        try:
+            products_data = await db_service.find_many(
+                self.collection_name,
+                {"$or": [
+                    {LOCALIZED_FIELD: {"$exists": False}},
+                    {SEARCH_TEXT_FIELD: {"$exists": False}},
+                    {DISCOUNT_FIELD: {"$exists": False}}
+                ]},
+                projection={"_id": 1}
+            )
+            for product_data in products_data:
+                await self.refresh_derived_fields(product_data["_id"])
+            if products_data:
+                await self.record_change(None)
+            return len(products_data)
+        except Exception as e:
+            logger.error(f"Error backfilling product views: {str(e)}")
+            raise
+
+    async def load_catalog_views(self) -> Dict[str, List[dict]]:
+        """Localized views of the active catalog per language, in listing order."""
+        products_data = await db_service.find_many(
+            self.collection_name,
+            {"is_active": True},
+            projection={SEARCH_TEXT_FIELD: 0},
+            sort=self.listing_sort
+        )
+        return {
+            language: [self.view_for(product_data, language) for product_data in products_data]
+            for language in SUPPORTED_LANGUAGES
+        }
+
+    async def get_snapshot(self) -> CatalogSnapshot:
+        if self.snapshot_file:
+            return await self._get_mapped_snapshot()
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.catalog_version:
+            return snapshot
+
+        async with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == self.catalog_version:
+                return snapshot
+
+            # Label the snapshot with the version seen before loading, so a write
+            # that lands mid-build triggers another rebuild on the next read.
+            version = self.catalog_version
+            snapshot = CatalogSnapshot(version, await self.load_catalog_views())
+            self._snapshot = snapshot
+            logger.info(f"Built catalog snapshot v{version} with {len(snapshot)} products")
+            return snapshot
+
+    async def publish_snapshot_file(self) -> int:
+        """Rebuild the shared snapshot file from Mongo and swap it in atomically."""
+        views = await self.load_catalog_views()
+        await asyncio.to_thread(write_snapshot_file, self.snapshot_file, views)
+        count = max((len(items) for items in views.values()), default=0)
+        logger.info(f"Published catalog snapshot file {self.snapshot_file} with {count} products")
+        return count
+
+    def sync_snapshot_file(self):
+        """Notice a snapshot file published by another process since ours was mapped."""
+        snapshot = self._snapshot
+        if (
+            self.snapshot_file
+            and isinstance(snapshot, MappedCatalogSnapshot)
+            and snapshot.identity != snapshot_file_identity(self.snapshot_file)
+        ):
+            self._snapshot = None
+            self.bump_catalog_version()
+
+    async def _get_mapped_snapshot(self) -> MappedCatalogSnapshot:
+        self.sync_snapshot_file()
+        snapshot = self._snapshot
+        if isinstance(snapshot, MappedCatalogSnapshot) and snapshot.version == self.catalog_version:
+            return snapshot
+
+        async with self._snapshot_lock:
+            snapshot = self._snapshot
+            if isinstance(snapshot, MappedCatalogSnapshot) and snapshot.version == self.catalog_version:
+                return snapshot
+
+            version = self.catalog_version
+            if snapshot_file_identity(self.snapshot_file) is None:
+                # First worker up builds the file; normally build_snapshot.py has
+                await self.publish_snapshot_file()
+            # The previous mapping stays valid for readers still holding it and
+            # is unmapped when the last reference goes away
+            snapshot = MappedCatalogSnapshot(self.snapshot_file, version)
+            self._snapshot = snapshot
+            logger.info(f"Mapped catalog snapshot file v{version} with {len(snapshot)} products")
+            return snapshot
+
+    async def get_views_by_ids(self, product_ids: List[str], language: str) -> List[dict]:
+        """Localized active products for ``product_ids``, in the order given."""
+        if language not in SUPPORTED_LANGUAGES:
+            language = DEFAULT_LANGUAGE
+        if self.snapshot_enabled:
+            snapshot = await self.get_snapshot()
+            if snapshot.supports(language):
+                return snapshot.get_many(language, product_ids)
+
+        products_data = await db_service.find_many(
+            self.collection_name,
+            {"_id": {"$in": [ObjectId(product_id) for product_id in product_ids]}, "is_active": True},
+            projection=self.listing_projection(language),
+            secondary=True
+        )
+        products_data = await self.with_legacy_documents(products_data, language)
+        by_id = {str(product_data["_id"]): product_data for product_data in products_data}
+        return [
+            self.view_for(by_id[product_id], language)
+            for product_id in product_ids
+            if product_id in by_id
+        ]
+
+    async def get_products_batch(self, product_ids: List[str], language: str = "es") -> tuple:
+        """Resolve many products in one query: (views in request order, missing IDs)."""
+        try:
+            # Duplicates are resolved once; malformed IDs can never match
+            requested = list(dict.fromkeys(product_ids))
+            valid_ids = [product_id for product_id in requested if ObjectId.is_valid(product_id)]
+            items = await self.get_views_by_ids(valid_ids, language) if valid_ids else []
+            found = {item["id"] for item in items}
+            return items, [product_id for product_id in requested if product_id not in found]
+        except Exception as e:
+            logger.error(f"Error getting product batch: {str(e)}")
+            raise
 
     async def create_product(self, product_data: ProductCreate) -> Product:
         try:
-            product_dict = product_data.dict(by_alias=True, exclude_unset=True)
+            product_dict = product_data.dict()
+            product_dict["_id"] = ObjectId()
+            product = Product(**product_dict)
+            product_dict["created_at"] = product.created_at
+            product_dict["updated_at"] = product.updated_at
+            product_dict[FAVORITE_COUNT_FIELD] = 0
+            product_dict.update(self.derived_fields(product))
+
             result = await db_service.insert_one(self.collection_name, product_dict)
+            search_indexes.index_product(product_dict)
+            product_id = str(product_dict["_id"])
+            await self.record_change(product_id, *self.write_tags(product_id, product_dict["category"]))
             
             created_product = await db_service.find_one(
                 self.collection_name, 
@@ -25,6 +502,7 @@ class ProductService:
             logger.error(f"Error creating product: {str(e)}")
             raise
 
+    @single_flight("products.get_product_by_id")
     async def get_product_by_id(self, product_id: str) -> Optional[Product]:
         try:
             if not ObjectId.is_valid(product_id):
@@ -32,7 +510,8 @@ class ProductService:
                 
             product_data = await db_service.find_one(
                 self.collection_name,
-                {"_id": ObjectId(product_id)}
+                {"_id": ObjectId(product_id)},
+                projection={LOCALIZED_FIELD: 0, SEARCH_TEXT_FIELD: 0}
             )
             
             if product_data:
@@ -42,67 +521,165 @@ class ProductService:
             logger.error(f"Error getting product by ID: {str(e)}")
             raise
 
+    @cached("products.get_products", tags=listing_tags)
+    @single_flight("products.get_products")
     async def get_products(
         self, 
         category: Optional[str] = None,
         language: str = "es",
         search: Optional[str] = None,
         limit: int = 50,
-        skip: int = 0
-    ) -> List[ProductResponse]:
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        search_mode: str = "auto",
+        ranges: RangeFilters = RangeFilters(),
+        sort: Optional[str] = None
+    ) -> Page:
+        sort = sort or self.default_sort
+        # A cursor supersedes skip: the page starts right after the cursor row
+        after = decode_cursor(cursor, self.sorts[sort]) if cursor else None
+        if after:
+            skip = 0
+
+        page = await self._find_products(category, language, search, limit, skip, after, search_mode, ranges, sort)
+        if page.items or not search:
+            return page
+
+        # Nothing matched as typed: retry once with misspellings and missing accents fixed
         try:
-            filter_dict = {"is_active": True}
-            
-            if category:
-                filter_dict["category"] = category
-                
-            if search:
-                filter_dict["$or"] = [
-                    {f"name.{language}": {"$regex": search, "$options": "i"}},
-                    {f"description.{language}": {"$regex": search, "$options": "i"}},
-                    {f"features.{language}": {"$in": [{"$regex": search, "$options": "i"}]}}
-                ]
+            corrected = await fuzzy_index.correct_product_query(search, language)
+        except Exception:
+            return page
+        if not corrected:
+            return page
+        retried = await self._find_products(
+            category, language, corrected, limit, skip, after, search_mode, ranges, sort
+        )
+        return retried._replace(corrected_query=corrected) if retried.items else page
+
+    async def _find_products(
+        self,
+        category: Optional[str],
+        language: str,
+        search: Optional[str],
+        limit: int,
+        skip: int,
+        after: Optional[list],
+        search_mode: str,
+        ranges: RangeFilters = RangeFilters(),
+        sort: Optional[str] = None
+    ) -> Page:
+        sort = sort or self.default_sort
+        if language not in SUPPORTED_LANGUAGES:
+            # Like categories and suggestions: unknown languages get the default one
+            language = DEFAULT_LANGUAGE
+        # The in-memory paths only know the default order and no range filters;
+        # everything else goes to Mongo and its compound indexes
+        in_memory = sort == self.default_sort and not ranges.active
+        relevance_ranked = bool(search) and (
+            search_mode == "text"
+            or (search_mode == "auto" and in_memory and self.search_engine_enabled and search_engine.supports(language))
+        )
+        if relevance_ranked and after:
+            # Relevance-ranked results page by offset only; ignoring the cursor
+            # would serve the first page again
+            raise InvalidCursor("Cursors are not supported for relevance-ranked search; use skip")
+        try:
+            if search and search_mode == "text":
+                return Page(await self._text_search(search, language, category, limit, skip, ranges))
+
+            if relevance_ranked:
+                product_ids = search_engine.search_products(
+                    search,
+                    language,
+                    category=category,
+                    limit=skip + limit
+                )[skip:]
+                return Page(await self.get_views_by_ids(product_ids, language))
+
+            if in_memory and self.snapshot_enabled:
+                snapshot = await self.get_snapshot()
+                if snapshot.supports(language):
+                    products = snapshot.query(
+                        language,
+                        category=category,
+                        search=search,
+                        limit=limit,
+                        skip=skip,
+                        after_id=str(after[0]) if after else None
+                    )
+                    return Page(products, self.next_cursor(products, limit))
+
+            sort_spec = self.sorts[sort]
+            filter_dict = self.build_filter(category, language, search, ranges)
+
+            if after:
+                filter_dict = {"$and": [filter_dict, keyset_filter(sort_spec, after)]}
             
             products_data = await db_service.find_many(
                 self.collection_name,
                 filter_dict,
                 limit=limit,
-                skip=skip
+                skip=skip,
+                projection=self.listing_projection(language),
+                sort=sort_spec,
+                secondary=True
+            )
+            products_data = await self.with_legacy_documents(products_data, language)
+
+            return Page(
+                [self.view_for(product_data, language) for product_data in products_data],
+                cursor_after(sort_spec, products_data, limit)
             )
-            
-            # Transform products to localized response
-            products = []
-            for product_data in products_data:
-                product = Product(**product_data)
-                localized_product = ProductResponse(
-                    id=str(product.id),
-                    name=product.name.dict()[language],
-                    description=product.description.dict()[language],
-                    category=product.category,
-                    price=product.price,
-                    originalPrice=product.original_price,
-                    image=product.image,
-                    amazonLink=product.amazon_link,
-                    rating=product.rating,
-                    reviews=product.reviews,
-                    features=product.features.get(language, []),
-                    isActive=product.is_active,
-                    createdAt=product.created_at,
-                    updatedAt=product.updated_at
-                )
-                products.append(localized_product)
-            
-            return products
         except Exception as e:
             logger.error(f"Error getting products: {str(e)}")
             raise
 
+    async def _text_search(
+        self,
+        search: str,
+        language: str,
+        category: Optional[str],
+        limit: int,
+        skip: int,
+        ranges: RangeFilters = RangeFilters()
+    ) -> List[dict]:
+        filter_dict = {
+            "$text": {"$search": search, "$language": TEXT_SEARCH_LANGUAGES[language]},
+            "is_active": True
+        }
+        if category:
+            filter_dict["category"] = category
+        filter_dict.update(ranges.query())
+
+        projection = self.listing_projection(language)
+        projection["score"] = {"$meta": "textScore"}
+        products_data = await db_service.find_many(
+            self.collection_name,
+            filter_dict,
+            limit=limit,
+            skip=skip,
+            projection=projection,
+            sort=[("score", {"$meta": "textScore"}), ("_id", 1)],
+            secondary=True
+        )
+        products_data = await self.with_legacy_documents(products_data, language)
+        return [
+            dict(self.view_for(product_data, language), score=product_data["score"])
+            for product_data in products_data
+        ]
+
     async def update_product(self, product_id: str, product_data: ProductUpdate) -> Optional[Product]:
         try:
             if not ObjectId.is_valid(product_id):
                 return None
                 
-            update_dict = product_data.dict(by_alias=True, exclude_unset=True)
+            update_dict = product_data.dict(exclude_unset=True)
+            update_dict["updated_at"] = product_data.updated_at
+            # Listings of the category the product leaves are invalidated too
+            previous = await db_service.find_one(
+                self.collection_name, {"_id": ObjectId(product_id)}, projection={"category": 1}
+            )
             
             result = await db_service.update_one(
                 self.collection_name,
@@ -111,6 +688,14 @@ class ProductService:
             )
             
             if result.modified_count:
+                product_data = await self.refresh_derived_fields(ObjectId(product_id))
+                if product_data:
+                    search_indexes.index_product(product_data)
+                await self.record_change(product_id, *self.write_tags(
+                    product_id,
+                    previous and previous.get("category"),
+                    product_data and product_data.get("category")
+                ))
                 return await self.get_product_by_id(product_id)
             return None
         except Exception as e:
@@ -122,36 +707,173 @@ class ProductService:
             if not ObjectId.is_valid(product_id):
                 return False
                 
+            previous = await db_service.find_one(
+                self.collection_name, {"_id": ObjectId(product_id)}, projection={"category": 1}
+            )
             result = await db_service.delete_one(
                 self.collection_name,
                 {"_id": ObjectId(product_id)}
             )
             
-            return result.deleted_count > 0
+            if result.deleted_count > 0:
+                search_indexes.remove_product(product_id)
+                await self.record_change(
+                    product_id, *self.write_tags(product_id, previous and previous.get("category"))
+                )
+                return True
+            return False
         except Exception as e:
             logger.error(f"Error deleting product: {str(e)}")
             raise
 
-    async def get_products_count(self, category: Optional[str] = None, search: Optional[str] = None) -> int:
+    async def get_products_count(
+        self,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        language: str = "es",
+        ranges: RangeFilters = RangeFilters()
+    ) -> int:
         try:
-            filter_dict = {"is_active": True}
-            
-            if category:
-                filter_dict["category"] = category
-                
-            if search:
-                filter_dict["$or"] = [
-                    {"name.es": {"$regex": search, "$options": "i"}},
-                    {"name.en": {"$regex": search, "$options": "i"}},
-                    {"description.es": {"$regex": search, "$options": "i"}},
-                    {"description.en": {"$regex": search, "$options": "i"}}
-                ]
-            
-            return await db_service.count_documents(self.collection_name, filter_dict)
+            return await db_service.count_documents(
+                self.collection_name,
+                self.build_filter(category, language, search, ranges),
+                secondary=True
+            )
         except Exception as e:
             logger.error(f"Error counting products: {str(e)}")
             raise
 
+    @single_flight("products.get_faceted_products")
+    async def get_faceted_products(
+        self,
+        category: Optional[str] = None,
+        language: str = "es",
+        search: Optional[str] = None,
+        limit: int = 50,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        ranges: RangeFilters = RangeFilters(),
+        sort: Optional[str] = None
+    ) -> FacetedPage:
+        """A page of products plus category, price and rating counts for the whole match set.
+
+        Facets ignore the cursor and skip, and are cached per filter signature
+        until the catalog changes.
+        """
+        sort = sort or self.default_sort
+        if language not in SUPPORTED_LANGUAGES:
+            language = DEFAULT_LANGUAGE
+        after = decode_cursor(cursor, self.sorts[sort]) if cursor else None
+        if after:
+            skip = 0
+
+        try:
+            key = (self.catalog_version, language, category, search or None, ranges)
+            cached = self._facet_cache.get(key)
+            if cached is not None:
+                self._facet_cache.move_to_end(key)
+                page = await self._find_products(
+                    category, language, search, limit, skip, after, "regex", ranges, sort
+                )
+                return FacetedPage(page.items, page.next_cursor, *cached)
+
+            if not ranges.active and self.snapshot_enabled:
+                snapshot = await self.get_snapshot()
+                if snapshot.supports(language):
+                    total, facets = self._snapshot_facets(snapshot.matches(language, category, search))
+                    self._cache_facets(key, total, facets)
+                    page = await self._find_products(
+                        category, language, search, limit, skip, after, "regex", ranges, sort
+                    )
+                    return FacetedPage(page.items, page.next_cursor, total, facets)
+
+            page, total, facets = await self._aggregate_facets(
+                category, language, search, limit, skip, after, ranges, sort
+            )
+            self._cache_facets(key, total, facets)
+            return FacetedPage(page.items, page.next_cursor, total, facets)
+        except Exception as e:
+            logger.error(f"Error getting faceted products: {str(e)}")
+            raise
+
+    def _cache_facets(self, key: tuple, total: int, facets: dict):
+        self._facet_cache[key] = (total, facets)
+        self._facet_cache.move_to_end(key)
+        while len(self._facet_cache) > FACET_CACHE_SIZE:
+            self._facet_cache.popitem(last=False)
+
+    @staticmethod
+    def _snapshot_facets(products) -> tuple:
+        total = 0
+        categories: Dict[str, int] = {}
+        prices: Dict[float, int] = {}
+        ratings: Dict[float, int] = {}
+        for product in products:
+            total += 1
+            categories[product["category"]] = categories.get(product["category"], 0) + 1
+            price = bucket_of(product["price"], PRICE_BUCKETS)
+            prices[price] = prices.get(price, 0) + 1
+            rating = bucket_of(product["rating"], RATING_BUCKETS)
+            ratings[rating] = ratings.get(rating, 0) + 1
+        return total, {
+            "categories": category_facets(categories),
+            "price": bucket_facets(prices, PRICE_BUCKETS),
+            "rating": bucket_facets(ratings, RATING_BUCKETS)
+        }
+
+    async def _aggregate_facets(
+        self,
+        category: Optional[str],
+        language: str,
+        search: Optional[str],
+        limit: int,
+        skip: int,
+        after: Optional[list],
+        ranges: RangeFilters,
+        sort: str
+    ) -> tuple:
+        # The page and every facet come back from one $facet round trip
+        sort_spec = self.sorts[sort]
+        items_pipeline = []
+        if after:
+            items_pipeline.append({"$match": keyset_filter(sort_spec, after)})
+        items_pipeline.append({"$sort": dict(sort_spec)})
+        if skip:
+            items_pipeline.append({"$skip": skip})
+        items_pipeline.append({"$limit": limit})
+        items_pipeline.append({"$project": self.listing_projection(language)})
+
+        result = await db_service.aggregate(self.collection_name, [
+            {"$match": self.build_filter(category, language, search, ranges)},
+            {"$facet": {
+                "items": items_pipeline,
+                "total": [{"$count": "count"}],
+                "categories": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}],
+                "price": [{"$bucket": {
+                    "groupBy": "$price", "boundaries": PRICE_BUCKETS, "default": PRICE_BUCKETS[-1]
+                }}],
+                "rating": [{"$bucket": {
+                    "groupBy": "$rating", "boundaries": RATING_BUCKETS, "default": RATING_BUCKETS[-1]
+                }}]
+            }}
+        ], secondary=True)
+        facet_data = result[0]
+
+        products_data = await self.with_legacy_documents(facet_data["items"], language)
+        page = Page(
+            [self.view_for(product_data, language) for product_data in products_data],
+            cursor_after(sort_spec, products_data, limit)
+        )
+        total = facet_data["total"][0]["count"] if facet_data["total"] else 0
+        facets = {
+            "categories": category_facets({
+                bucket["_id"]: bucket["count"] for bucket in facet_data["categories"]
+            }),
+            "price": bucket_facets({bucket["_id"]: bucket["count"] for bucket in facet_data["price"]}, PRICE_BUCKETS),
+            "rating": bucket_facets({bucket["_id"]: bucket["count"] for bucket in facet_data["rating"]}, RATING_BUCKETS)
+        }
+        return page, total, facets
+
 
 # Global product service instance
 product_service = ProductService()
\ No newline at end of file
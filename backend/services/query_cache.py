@@ -0,0 +1,214 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Set, Tuple
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from pydantic import BaseModel
+from services.config import env_bool, env_int
+from services.single_flight import freeze
+import asyncio
+import inspect
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Default (ttl, stale) in seconds per cached method. Within ttl an entry is
+# served as is; for another ``stale`` seconds it is still served, while one
+# background task refreshes it. Override with QUERY_CACHE_<NAME>_TTL and
+# QUERY_CACHE_<NAME>_STALE, NAME being the method name upper-cased with dots
+# as underscores (e.g. QUERY_CACHE_PRODUCTS_GET_PRODUCTS_TTL).
+CACHE_DEFAULTS: Dict[str, Tuple[int, int]] = {
+    "products.get_products": (30, 300),
+    "articles.get_articles": (60, 600),
+    "articles.get_article_by_slug": (300, 3600),
+    "articles.get_related_articles": (300, 3600),
+}
+
+# Shared bounds for every cached method; override with QUERY_CACHE_MAX_ENTRIES
+# and QUERY_CACHE_MAX_BYTES
+MAX_ENTRIES = 2048
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def approximate_size(value: Any) -> int:
+    """Rough in-memory footprint of a service result, for the byte bound."""
+    if isinstance(value, (str, bytes)):
+        return len(value) + 48
+    if isinstance(value, dict):
+        return 64 + sum(approximate_size(key) + approximate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 56 + sum(approximate_size(item) for item in value)
+    if isinstance(value, BaseModel):
+        return approximate_size(value.__dict__)
+    if isinstance(value, datetime):
+        return 48
+    return 32
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    size: int
+    fresh_until: float
+    stale_until: float
+    tags: frozenset
+
+
+class QueryCache:
+    """LRU of service results with stale-while-revalidate and tag invalidation.
+
+    Results are shared objects: callers must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[Tuple[str, Hashable], CacheEntry]" = OrderedDict()
+        self._tagged: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self._refreshing: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self.size = 0
+        # Bumped by every invalidation, so a load that raced a write is not kept
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+
+    def windows(self, name: str) -> Tuple[int, int]:
+        ttl, stale = CACHE_DEFAULTS.get(name, (30, 300))
+        prefix = "QUERY_CACHE_" + name.upper().replace(".", "_")
+        return env_int(f"{prefix}_TTL", ttl), env_int(f"{prefix}_STALE", stale)
+
+    def _drop(self, key: Tuple[str, Hashable]) -> Optional[CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+            for tag in entry.tags:
+                keys = self._tagged.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tagged[tag]
+        return entry
+
+    def _store(self, key: Tuple[str, Hashable], value: Any, tags: Iterable[str], generation: int):
+        if generation != self._generation:
+            return
+        ttl, stale = self.windows(key[0])
+        size = approximate_size(value)
+        max_bytes = env_int("QUERY_CACHE_MAX_BYTES", MAX_BYTES)
+        self._drop(key)
+        if ttl <= 0 or size > max_bytes:
+            return
+
+        now = time.monotonic()
+        entry = CacheEntry(value, size, now + ttl, now + ttl + stale, frozenset(tags))
+        self._entries[key] = entry
+        self.size += size
+        for tag in entry.tags:
+            self._tagged.setdefault(tag, set()).add(key)
+
+        max_entries = env_int("QUERY_CACHE_MAX_ENTRIES", MAX_ENTRIES)
+        while len(self._entries) > max_entries or self.size > max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def _load(self, key, load: Callable, tags: Callable[[Any], Iterable[str]]) -> Any:
+        generation = self._generation
+        value = await load()
+        self._store(key, value, tags(value), generation)
+        return value
+
+    def _refresh(self, key, load: Callable, tags: Callable[[Any], Iterable[str]]):
+        if key in self._refreshing:
+            return
+        self.refreshes += 1
+
+        async def refresh():
+            try:
+                await self._load(key, load, tags)
+            except Exception as e:
+                # The stale entry keeps being served until it runs out
+                self.refresh_errors += 1
+                logger.error(f"Error refreshing {key[0]}: {str(e)}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.get_running_loop().create_task(refresh())
+
+    async def get(self, key, load: Callable, tags: Callable[[Any], Iterable[str]]) -> Any:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            if now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._refresh(key, load, tags)
+                return entry.value
+            self._drop(key)
+
+        self.misses += 1
+        return await self._load(key, load, tags)
+
+    def invalidate(self, *tags: str):
+        """Drop every entry carrying any of ``tags``."""
+        self._generation += 1
+        for tag in tags:
+            for key in list(self._tagged.get(tag, ())):
+                self._drop(key)
+
+    def clear(self, prefix: str = ""):
+        """Drop every entry of the methods whose name starts with ``prefix``."""
+        self._generation += 1
+        for key in [key for key in self._entries if key[0].startswith(prefix)]:
+            self._drop(key)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "evictions": self.evictions,
+            "refreshing": len(self._refreshing)
+        }
+
+
+# Global query cache instance
+query_cache = QueryCache()
+
+
+def cached(name: str, tags: Callable[[Dict[str, Any], Any], Iterable[str]]):
+    """Cache an async service method in ``query_cache`` under ``name``.
+
+    ``tags(arguments, result)`` names what the result depends on, so writes
+    can drop it with ``query_cache.invalidate``. QUERY_CACHE_ENABLED=false
+    calls straight through.
+    """
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        async def wrapper(*args, **kwargs):
+            if not env_bool("QUERY_CACHE_ENABLED", default=True):
+                return await method(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            # The first argument is the service instance, which is a singleton
+            arguments = dict(list(bound.arguments.items())[1:])
+            return await query_cache.get(
+                (name, freeze(arguments)),
+                lambda: method(*args, **kwargs),
+                lambda result: tags(arguments, result)
+            )
+
+        return wrapper
+
+    return decorator
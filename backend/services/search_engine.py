@@ -0,0 +1,314 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from contextlib import contextmanager
+from services.database import db_service
+from services.localization import SUPPORTED_LANGUAGES
+import heapq
+import logging
+import math
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+TAG_RE = re.compile(r"<[^>]+>")
+
+STOPWORDS = {
+    "es": {
+        "a", "al", "con", "de", "del", "el", "en", "es", "la", "las", "lo", "los",
+        "mas", "para", "por", "que", "se", "sin", "su", "sus", "un", "una", "y", "o"
+    },
+    "en": {
+        "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+        "it", "of", "on", "or", "the", "to", "with", "your"
+    },
+}
+
+# Per-field weights: a hit in a product name counts more than one in its description
+PRODUCT_FIELDS = {"name": 3.0, "features": 2.0, "description": 1.0}
+ARTICLE_FIELDS = {"title": 3.0, "tags": 2.0, "excerpt": 1.5, "content": 1.0}
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents, so "Champú" and "champu" compare equal."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def stem_es(word: str) -> str:
+    # Light stemmer: drop plural endings, then the final gender vowel
+    if len(word) > 4 and word.endswith("ces"):
+        word = word[:-3] + "z"
+    elif len(word) > 4 and word.endswith("es") and word[-3] not in "aeiou":
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith("s"):
+        word = word[:-1]
+    if len(word) > 4 and word[-1] in "aoe":
+        word = word[:-1]
+    return word
+
+
+def stem_en(word: str) -> str:
+    # Light stemmer: plurals and the most common verbal/adverbial suffixes
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ed"):
+        return word[:-2]
+    if len(word) > 4 and word.endswith("ly"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us")):
+        return word[:-1]
+    return word
+
+
+STEMMERS = {"es": stem_es, "en": stem_en}
+
+
+def analyze(text: str, language: str) -> List[str]:
+    stopwords = STOPWORDS.get(language, set())
+    stem = STEMMERS.get(language, lambda word: word)
+    return [stem(token) for token in TOKEN_RE.findall(fold(text)) if token not in stopwords]
+
+
+class InvertedIndex:
+    """BM25-ranked inverted index over weighted document fields."""
+
+    def __init__(self, language: str, fields: Dict[str, float], k1: float = 1.2, b: float = 0.75):
+        self.language = language
+        self.fields = fields
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.metadata: Dict[str, dict] = {}
+        self.total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: str, fields: Dict[str, Iterable[str]], metadata: Optional[dict] = None):
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+
+        frequencies: Dict[str, float] = {}
+        for field, weight in self.fields.items():
+            for text in fields.get(field) or []:
+                for term in analyze(text, self.language):
+                    frequencies[term] = frequencies.get(term, 0.0) + weight
+
+        length = sum(frequencies.values())
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        self.doc_terms[doc_id] = frequencies
+        self.doc_lengths[doc_id] = length
+        self.metadata[doc_id] = metadata or {}
+        self.total_length += length
+
+    def remove(self, doc_id: str):
+        frequencies = self.doc_terms.pop(doc_id, None)
+        if frequencies is None:
+            return
+        for term in frequencies:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self.metadata.pop(doc_id, None)
+
+    def score_terms(
+        self,
+        terms: Iterable[str],
+        predicate: Optional[Callable[[dict], bool]] = None
+    ) -> Dict[str, float]:
+        count = len(self.doc_lengths)
+        if not count:
+            return {}
+        average_length = self.total_length / count or 1.0
+
+        scores: Dict[str, float] = {}
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                if predicate is not None and not predicate(self.metadata[doc_id]):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        predicate: Optional[Callable[[dict], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        scores = self.score_terms(analyze(query, self.language), predicate)
+        ranked = ((doc_id, score) for doc_id, score in scores.items())
+        # Ties break on doc id so pages stay stable between requests
+        if limit is not None:
+            return heapq.nsmallest(limit, ranked, key=lambda item: (-item[1], item[0]))
+        return sorted(ranked, key=lambda item: (-item[1], item[0]))
+
+
+def strip_html(text: str) -> str:
+    return TAG_RE.sub(" ", text)
+
+
+class PendingWrites:
+    """Writes that arrive while an index is rebuilt, replayed onto the new one.
+
+    Each write names the indexes it targets ("products", "articles", ...);
+    replay() hands the method the freshly built indexes of that name.
+    """
+
+    def __init__(self):
+        self._writes: Optional[List[Tuple[str, Callable, tuple]]] = None
+
+    def record(self, target: str, method: Callable, *args):
+        if self._writes is not None:
+            self._writes.append((target, method, args))
+
+    @contextmanager
+    def collecting(self):
+        self._writes = []
+        try:
+            yield
+        finally:
+            self._writes = None
+
+    def replay(self, targets: Dict[str, object]):
+        for target, method, args in self._writes:
+            method(*args, indexes=targets[target])
+
+
+class SearchEngine:
+    """In-memory product and article search, kept current by the service write paths."""
+
+    def __init__(self):
+        self.ready = False
+        self._pending = PendingWrites()
+        self.products: Dict[str, InvertedIndex] = self._new_indexes(PRODUCT_FIELDS)
+        self.articles: Dict[str, InvertedIndex] = self._new_indexes(ARTICLE_FIELDS)
+
+    @staticmethod
+    def _new_indexes(fields: Dict[str, float]) -> Dict[str, InvertedIndex]:
+        return {language: InvertedIndex(language, fields) for language in SUPPORTED_LANGUAGES}
+
+    def index_product(self, product_data: dict, indexes: Optional[Dict[str, InvertedIndex]] = None):
+        if indexes is None:
+            self._pending.record("products", self.index_product, product_data)
+            indexes = self.products
+        doc_id = str(product_data["_id"])
+        if not product_data.get("is_active", True):
+            for index in indexes.values():
+                index.remove(doc_id)
+            return
+        for language, index in indexes.items():
+            index.add(
+                doc_id,
+                {
+                    "name": [product_data["name"][language]],
+                    "description": [product_data["description"][language]],
+                    "features": product_data.get("features", {}).get(language, [])
+                },
+                {"category": product_data.get("category")}
+            )
+
+    def remove_product(self, product_id: str, indexes: Optional[Dict[str, InvertedIndex]] = None):
+        if indexes is None:
+            self._pending.record("products", self.remove_product, product_id)
+            indexes = self.products
+        for index in indexes.values():
+            index.remove(product_id)
+
+    def index_article(self, article_data: dict, indexes: Optional[Dict[str, InvertedIndex]] = None):
+        if indexes is None:
+            self._pending.record("articles", self.index_article, article_data)
+            indexes = self.articles
+        doc_id = str(article_data["_id"])
+        if not article_data.get("is_published", True):
+            for index in indexes.values():
+                index.remove(doc_id)
+            return
+        for language, index in indexes.items():
+            index.add(
+                doc_id,
+                {
+                    "title": [article_data["title"][language]],
+                    "excerpt": [article_data["excerpt"][language]],
+                    "content": [strip_html(article_data["content"][language])],
+                    "tags": article_data.get("tags", [])
+                },
+                {"category": article_data.get("category")}
+            )
+
+    def remove_article(self, article_id: str, indexes: Optional[Dict[str, InvertedIndex]] = None):
+        if indexes is None:
+            self._pending.record("articles", self.remove_article, article_id)
+            indexes = self.articles
+        for index in indexes.values():
+            index.remove(article_id)
+
+    def search_products(
+        self,
+        query: str,
+        language: str,
+        category: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[str]:
+        predicate = (lambda metadata: metadata["category"] == category) if category else None
+        return [doc_id for doc_id, _ in self.products[language].search(query, limit, predicate)]
+
+    def search_articles(self, query: str, language: str, limit: Optional[int] = None) -> List[str]:
+        return [doc_id for doc_id, _ in self.articles[language].search(query, limit)]
+
+    def supports(self, language: str) -> bool:
+        return self.ready and language in self.products
+
+    async def build(self):
+        """Load every active product and published article into fresh indexes."""
+        try:
+            with self._pending.collecting():
+                products = self._new_indexes(PRODUCT_FIELDS)
+                articles = self._new_indexes(ARTICLE_FIELDS)
+
+                products_data = await db_service.find_many(
+                    "products",
+                    {"is_active": True},
+                    projection={"name": 1, "description": 1, "features": 1, "category": 1, "is_active": 1}
+                )
+                for product_data in products_data:
+                    self.index_product(product_data, products)
+
+                articles_data = await db_service.find_many(
+                    "articles",
+                    {"is_published": True},
+                    projection={
+                        "title": 1, "excerpt": 1, "content": 1, "tags": 1, "category": 1, "is_published": 1
+                    }
+                )
+                for article_data in articles_data:
+                    self.index_article(article_data, articles)
+
+                self._pending.replay({"products": products, "articles": articles})
+
+            self.products = products
+            self.articles = articles
+            self.ready = True
+            logger.info(
+                f"Search engine built with {len(products_data)} products and {len(articles_data)} articles"
+            )
+        except Exception as e:
+            logger.error(f"Error building search engine: {str(e)}")
+            raise
+
+
+# Global search engine instance
+search_engine = SearchEngine()
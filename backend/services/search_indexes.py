@@ -0,0 +1,37 @@
+from typing import List
+from services.search_engine import search_engine
+from services.fuzzy_index import fuzzy_index
+from services.suggest_index import suggest_index
+
+
+class SearchIndexes:
+    """Every in-memory index the write paths keep current, behind one call per write.
+
+    Indexes implement the writes that concern them; the rest are skipped
+    (only suggestions cover categories, for instance).
+    """
+
+    def __init__(self, *indexes):
+        self.indexes: List[object] = list(indexes)
+
+    def _each(self, method: str, *args):
+        for index in self.indexes:
+            write = getattr(index, method, None)
+            if write is not None:
+                write(*args)
+
+    def index_product(self, product_data: dict):
+        self._each("index_product", product_data)
+
+    def remove_product(self, product_id: str):
+        self._each("remove_product", product_id)
+
+    def index_article(self, article_data: dict):
+        self._each("index_article", article_data)
+
+    def index_category(self, category_data: dict):
+        self._each("index_category", category_data)
+
+
+# Global search indexes instance
+search_indexes = SearchIndexes(search_engine, fuzzy_index, suggest_index)
@@ -0,0 +1,144 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from functools import wraps
+from services.config import env_bool, env_int
+import asyncio
+import inspect
+import time
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable, order-normalized form of call arguments."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)) and not hasattr(value, "_fields"):
+        items = [freeze(item) for item in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    return value
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution and its result.
+
+    Optionally keeps each result for ``ttl`` seconds, so calls arriving just
+    after the flight lands are answered too. Results are shared objects:
+    callers must treat them as read-only.
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None):
+        self.name = name
+        self.ttl = ttl
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        self.errors = 0
+        # Bumped by clear(), so flights started before a write are neither
+        # joined nor cached after it
+        self._generation = 0
+
+    def current_ttl(self) -> float:
+        if self.ttl is not None:
+            return self.ttl
+        return env_int("SINGLE_FLIGHT_TTL_MS", 0) / 1000
+
+    def clear(self):
+        self._generation += 1
+        self._results.clear()
+        self._inflight.clear()
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self.cache_hits += 1
+                return cached[1]
+            del self._results[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shielded: one waiter being cancelled must not cancel the shared call
+            return await asyncio.shield(future)
+
+        self.executions += 1
+        generation = self._generation
+        future = asyncio.ensure_future(call())
+        self._inflight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            if future.done():
+                self._forget(key, future)
+            else:
+                # Our caller was cancelled; later arrivals can still join the flight
+                future.add_done_callback(lambda _: self._forget(key, future))
+
+        ttl = self.current_ttl()
+        if ttl > 0 and generation == self._generation:
+            self._results[key] = (time.monotonic() + ttl, result)
+        return result
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "in_flight": len(self._inflight)
+        }
+
+
+# Every flight by name, for /api/stats and invalidation
+flights: Dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str, ttl: Optional[float] = None):
+    """Coalesce concurrent identical calls of an async service method.
+
+    Calls are identical when their arguments, after defaults are applied,
+    are equal. ``ttl`` (seconds) keeps results briefly; by default it comes
+    from SINGLE_FLIGHT_TTL_MS, which is 0 (coalescing only). Setting
+    SINGLE_FLIGHT_ENABLED=false calls straight through.
+    """
+    flight = flights.setdefault(name, SingleFlight(name, ttl))
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        async def wrapper(*args, **kwargs):
+            if not env_bool("SINGLE_FLIGHT_ENABLED", default=True):
+                return await method(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            # The first argument is the service instance, which is a singleton
+            key = freeze(list(bound.arguments.values())[1:])
+            return await flight.run(key, lambda: method(*args, **kwargs))
+
+        wrapper.flight = flight
+        return wrapper
+
+    return decorator
+
+
+def invalidate_flights(prefix: str):
+    """Drop TTL-cached results of every flight whose name starts with ``prefix``."""
+    for name, flight in flights.items():
+        if name.startswith(prefix):
+            flight.clear()
+
+
+def single_flight_stats() -> Dict[str, dict]:
+    return {name: flight.stats() for name, flight in flights.items()}
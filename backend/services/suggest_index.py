@@ -0,0 +1,219 @@
+from typing import Dict, List, Optional, Tuple
+from bisect import bisect_left, insort
+from services.database import db_service
+from services.localization import SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE
+from services.search_engine import PendingWrites, fold
+import asyncio
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+WORD_START_RE = re.compile(r"\w+")
+
+# Candidates examined per lookup; bounds latency on very common prefixes
+MAX_CANDIDATES = 200
+
+# Documents indexed by build() between yields to the event loop
+BUILD_BATCH = 1000
+
+# Categories outrank products, which outrank articles; popularity breaks ties
+KIND_RANKS = {"category": 3, "product": 2, "article": 1}
+
+
+class PrefixIndex:
+    """Sorted array of (folded key, entry key) pairs answering prefix lookups.
+
+    Every word start of a suggestion is indexed, so "bambu" finds
+    "Cepillo de Dientes de Bambú" as well as titles that begin with it.
+    """
+
+    def __init__(self):
+        self.keys: List[Tuple[str, tuple]] = []
+        # entry key -> (suggestion payload, popularity, folded text)
+        self.entries: Dict[tuple, Tuple[dict, float, str]] = {}
+        # False while a bulk load appends keys unsorted; see defer_sorting()
+        self._sorted = True
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _suffixes(text: str) -> List[str]:
+        folded = fold(text)
+        return [folded[match.start():] for match in WORD_START_RE.finditer(folded)]
+
+    def add(self, kind: str, ref: str, text: str, popularity: float = 0.0):
+        entry_key = (kind, ref)
+        self.remove(kind, ref)
+        self.entries[entry_key] = ({"type": kind, "id": ref, "text": text}, popularity, fold(text))
+        for suffix in self._suffixes(text):
+            if self._sorted:
+                insort(self.keys, (suffix, entry_key))
+            else:
+                self.keys.append((suffix, entry_key))
+
+    def remove(self, kind: str, ref: str):
+        entry_key = (kind, ref)
+        entry = self.entries.pop(entry_key, None)
+        if entry is None:
+            return
+        if not self._sorted:
+            self.keys = [key for key in self.keys if key[1] != entry_key]
+            return
+        for suffix in self._suffixes(entry[0]["text"]):
+            position = bisect_left(self.keys, (suffix, entry_key))
+            if position < len(self.keys) and self.keys[position] == (suffix, entry_key):
+                del self.keys[position]
+
+    def defer_sorting(self):
+        """Start a bulk load: adds append, and finish_sorting() sorts once at the end.
+
+        Inserting each key in place is quadratic over a full build.
+        """
+        self._sorted = False
+
+    def finish_sorting(self):
+        self.keys.sort()
+        self._sorted = True
+
+    def suggest(self, prefix: str, limit: int) -> List[dict]:
+        prefix = fold(prefix).strip()
+        if not prefix:
+            return []
+
+        candidates: Dict[tuple, bool] = {}
+        position = bisect_left(self.keys, (prefix,))
+        while position < len(self.keys) and len(candidates) < MAX_CANDIDATES:
+            key, entry_key = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            candidates[entry_key] = True
+            position += 1
+
+        def rank(entry_key):
+            _, popularity, folded = self.entries[entry_key]
+            # Suggestions that start with the prefix beat later-word matches
+            return (not folded.startswith(prefix), -KIND_RANKS[entry_key[0]], -popularity, len(folded))
+
+        return [self.entries[entry_key][0] for entry_key in sorted(candidates, key=rank)[:limit]]
+
+
+class SuggestIndex:
+    """Per-language typeahead over product names, category names and article titles."""
+
+    def __init__(self):
+        self.indexes: Dict[str, PrefixIndex] = self._new_indexes()
+        self.ready = False
+        self._build_lock = asyncio.Lock()
+        self._pending = PendingWrites()
+
+    @staticmethod
+    def _new_indexes() -> Dict[str, PrefixIndex]:
+        return {language: PrefixIndex() for language in SUPPORTED_LANGUAGES}
+
+    def index_product(self, product_data: dict, indexes: Optional[Dict[str, PrefixIndex]] = None):
+        if indexes is None:
+            self._pending.record("indexes", self.index_product, product_data)
+            indexes = self.indexes
+        product_id = str(product_data["_id"])
+        for language, index in indexes.items():
+            if product_data.get("is_active", True):
+                index.add("product", product_id, product_data["name"][language], product_data.get("reviews") or 0)
+            else:
+                index.remove("product", product_id)
+
+    def remove_product(self, product_id: str, indexes: Optional[Dict[str, PrefixIndex]] = None):
+        if indexes is None:
+            self._pending.record("indexes", self.remove_product, product_id)
+            indexes = self.indexes
+        for index in indexes.values():
+            index.remove("product", product_id)
+
+    def index_category(self, category_data: dict, indexes: Optional[Dict[str, PrefixIndex]] = None):
+        if indexes is None:
+            self._pending.record("indexes", self.index_category, category_data)
+            indexes = self.indexes
+        for language, index in indexes.items():
+            if category_data.get("is_active", True):
+                index.add("category", category_data["category_id"], category_data["name"][language])
+            else:
+                index.remove("category", category_data["category_id"])
+
+    def index_article(self, article_data: dict, indexes: Optional[Dict[str, PrefixIndex]] = None):
+        if indexes is None:
+            self._pending.record("indexes", self.index_article, article_data)
+            indexes = self.indexes
+        for language, index in indexes.items():
+            if article_data.get("is_published", True):
+                index.add("article", article_data["slug"], article_data["title"][language])
+            else:
+                index.remove("article", article_data["slug"])
+
+    async def build(self):
+        try:
+            with self._pending.collecting():
+                indexes = self._new_indexes()
+                for index in indexes.values():
+                    index.defer_sorting()
+
+                products_data = await db_service.find_many(
+                    "products",
+                    {"is_active": True},
+                    projection={"name": 1, "reviews": 1, "is_active": 1}
+                )
+                for position, product_data in enumerate(products_data, 1):
+                    self.index_product(product_data, indexes)
+                    if position % BUILD_BATCH == 0:
+                        await asyncio.sleep(0)
+
+                categories_data = await db_service.find_many(
+                    "categories",
+                    {"is_active": True},
+                    projection={"category_id": 1, "name": 1, "is_active": 1}
+                )
+                for category_data in categories_data:
+                    self.index_category(category_data, indexes)
+
+                articles_data = await db_service.find_many(
+                    "articles",
+                    {"is_published": True},
+                    projection={"slug": 1, "title": 1, "is_published": 1}
+                )
+                for position, article_data in enumerate(articles_data, 1):
+                    self.index_article(article_data, indexes)
+                    if position % BUILD_BATCH == 0:
+                        await asyncio.sleep(0)
+
+                for index in indexes.values():
+                    index.finish_sorting()
+                    await asyncio.sleep(0)
+
+                # One set of indexes holds every kind of suggestion
+                self._pending.replay({"indexes": indexes})
+
+            self.indexes = indexes
+            self.ready = True
+            logger.info(
+                f"Suggest index built with {len(products_data)} products, "
+                f"{len(categories_data)} categories and {len(articles_data)} articles"
+            )
+        except Exception as e:
+            logger.error(f"Error building suggest index: {str(e)}")
+            raise
+
+    async def ensure_ready(self):
+        if self.ready:
+            return
+        async with self._build_lock:
+            if not self.ready:
+                await self.build()
+
+    async def suggest(self, prefix: str, language: str = DEFAULT_LANGUAGE, limit: int = 8) -> List[dict]:
+        await self.ensure_ready()
+        index = self.indexes.get(language) or self.indexes[DEFAULT_LANGUAGE]
+        return index.suggest(prefix, limit)
+
+
+# Global suggest index instance
+suggest_index = SuggestIndex()
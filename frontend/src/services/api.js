@@ -49,11 +49,21 @@ export const apiService = {
     return response.data;
   },
 
+  async getProductsBatch(ids, language = 'es') {
+    const response = await api.post('/products/batch', { ids, language });
+    return response.data;
+  },
+
   async searchProducts(params = {}) {
     const response = await api.get('/search', { params });
     return response.data;
   },
 
+  async getSuggestions(q, language = 'es', limit = 8) {
+    const response = await api.get('/search/suggest', { params: { q, language, limit } });
+    return response.data;
+  },
+
   // Categories
   async getCategories(language = 'es') {
     const response = await api.get('/categories', { params: { language } });
@@ -82,8 +92,8 @@ export const apiService = {
   },
 
   // Favorites
-  async getFavorites(userId) {
-    const response = await api.get(`/favorites/${userId}`);
+  async getFavorites(userId, params = {}) {
+    const response = await api.get(`/favorites/${userId}`, { params });
     return response.data;
   },
 
@@ -92,6 +102,11 @@ export const apiService = {
     return response.data;
   },
 
+  async syncFavorites(userId, add = [], remove = []) {
+    const response = await api.post('/favorites/bulk', { userId, add, remove });
+    return response.data;
+  },
+
   async removeFavorite(userId, productId) {
     const response = await api.delete(`/favorites/${userId}/${productId}`);
     return response.data;
@@ -0,0 +1,72 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend is run from its own directory, so its packages are top-level
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Run a coroutine to completion on one loop shared by the whole session.
+
+    Service singletons hold asyncio primitives, which bind to the first loop
+    that uses them.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def db(run):
+    """db_service backed by an in-memory Motor double, with service caches reset."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from services.database import db_service
+    from services.product_service import product_service
+    from services.category_service import category_service
+    from services.query_cache import query_cache
+    from services.single_flight import invalidate_flights
+
+    client = mongomock_motor.AsyncMongoMockClient()
+    db_service.client = client
+    db_service.db = client["test"]
+    product_service.bump_catalog_version()
+    product_service._snapshot = None
+    product_service._facet_cache.clear()
+    category_service.invalidate()
+    query_cache.clear()
+    invalidate_flights("")
+    yield db_service
+    db_service.client = None
+    db_service.db = None
+
+
+def product_payload(**overrides) -> dict:
+    payload = {
+        "name": {"es": "Cepillo de bambú", "en": "Bamboo toothbrush"},
+        "description": {"es": "Cepillo biodegradable", "en": "Biodegradable brush"},
+        "category": "cepillos-bambu",
+        "price": 4.99,
+        "originalPrice": 6.99,
+        "image": "https://example.com/brush.jpg",
+        "amazonLink": "https://amazon.example/brush",
+        "rating": 4.5,
+        "reviews": 120,
+        "features": {"es": ["Mango de bambú"], "en": ["Bamboo handle"]},
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def create_product(run, db):
+    from models.product import ProductCreate
+    from services.product_service import product_service
+
+    def create(**overrides):
+        return run(product_service.create_product(ProductCreate(**product_payload(**overrides))))
+
+    return create
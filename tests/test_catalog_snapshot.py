@@ -0,0 +1,147 @@
+import os
+
+import pytest
+from bson import ObjectId
+
+from services.catalog_snapshot import (
+    CatalogSnapshot, MappedCatalogSnapshot, snapshot_file_identity, write_snapshot_file
+)
+from services.product_service import product_service
+
+
+def view(product_id: str, name: str, category: str, features=()) -> dict:
+    return {"id": product_id, "name": name, "description": f"{name} ecológico",
+            "category": category, "features": list(features), "price": 4.99}
+
+
+@pytest.fixture
+def catalog():
+    ids = sorted(str(ObjectId()) for _ in range(6))
+    return {
+        "es": [
+            view(ids[0], "Cepillo de bambú", "cepillos-bambu", ["Mango de bambú"]),
+            view(ids[1], "Champú sólido", "champu-solido"),
+            view(ids[2], "Cepillo infantil", "cepillos-bambu"),
+            view(ids[3], "Pastilla de jabón", "jabones", ["Sin plástico"]),
+            view(ids[4], "Champú de romero", "champu-solido"),
+            view(ids[5], "Ñame cepillo", "cepillos-bambu"),
+        ],
+        "en": [view(ids[0], "Bamboo toothbrush", "cepillos-bambu")],
+    }
+
+
+@pytest.fixture
+def snapshots(tmp_path, catalog):
+    path = str(tmp_path / "catalog.snap")
+    write_snapshot_file(path, catalog)
+    return CatalogSnapshot(1, catalog), MappedCatalogSnapshot(path, 1)
+
+
+def ids_of(products):
+    return [product["id"] for product in products]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"category": "cepillos-bambu"},
+    {"search": "CEPILLO"},
+    {"search": "plástico"},
+    {"search": "ñame"},
+    {"category": "champu-solido", "search": "romero"},
+    {"category": "missing"},
+    {"skip": 2, "limit": 2},
+])
+def test_mapped_queries_match_the_in_memory_snapshot(snapshots, filters):
+    in_memory, mapped = snapshots
+
+    assert mapped.query("es", **filters) == in_memory.query("es", **filters)
+
+
+def test_mapped_cursor_bisects_the_id_table(snapshots, catalog):
+    in_memory, mapped = snapshots
+    ids = ids_of(catalog["es"])
+
+    for after_id in ids + ["0" * 24, "f" * 24, str(ObjectId())]:
+        assert ids_of(mapped.query("es", after_id=after_id)) == ids_of(in_memory.query("es", after_id=after_id))
+    assert ids_of(mapped.query("es", category="cepillos-bambu", after_id=ids[0])) == [ids[2], ids[5]]
+
+
+def test_mapped_get_many_keeps_the_order_given(snapshots, catalog):
+    _, mapped = snapshots
+    ids = ids_of(catalog["es"])
+
+    found = mapped.get_many("es", [ids[4], "not-an-id", str(ObjectId()), ids[0], "ñ" * 24])
+
+    assert found == [catalog["es"][4], catalog["es"][0]]
+    assert mapped.get_many("en", [ids[4], ids[0]]) == [catalog["en"][0]]
+
+
+def test_mapped_languages_and_size(snapshots):
+    _, mapped = snapshots
+
+    assert mapped.supports("en") and not mapped.supports("fr")
+    assert len(mapped) == 6
+
+
+def test_rejects_files_that_are_not_snapshots(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a snapshot")
+
+    with pytest.raises(ValueError):
+        MappedCatalogSnapshot(str(path), 1)
+
+
+def test_identity_follows_the_mapped_file_across_replace(tmp_path, catalog):
+    path = str(tmp_path / "catalog.snap")
+    write_snapshot_file(path, catalog)
+    mapped = MappedCatalogSnapshot(path, 1)
+    assert mapped.identity == snapshot_file_identity(path)
+
+    write_snapshot_file(path, {"es": catalog["es"][:2]})
+
+    # The old mapping still reads its own file, and no longer matches the path
+    assert mapped.identity != snapshot_file_identity(path)
+    assert len(mapped) == 6
+    assert len(MappedCatalogSnapshot(path, 2)) == 2
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_identity_comes_from_the_opened_file(tmp_path, catalog, monkeypatch):
+    path = str(tmp_path / "catalog.snap")
+    write_snapshot_file(path, catalog)
+    opened_identity = snapshot_file_identity(path)
+
+    # Another worker swaps a new file in between our open() and any stat of the path
+    real_open = open
+
+    def open_then_replace(name, *args, **kwargs):
+        opened = real_open(name, *args, **kwargs)
+        if name == path:
+            write_snapshot_file(path, {"es": catalog["es"][:1]})
+        return opened
+
+    monkeypatch.setattr("builtins.open", open_then_replace)
+    mapped = MappedCatalogSnapshot(path, 1)
+    monkeypatch.undo()
+
+    assert len(mapped) == 6
+    assert mapped.identity == opened_identity != snapshot_file_identity(path)
+
+
+def test_service_reloads_a_file_published_by_another_worker(run, db, create_product, tmp_path, monkeypatch):
+    monkeypatch.setenv("CATALOG_SNAPSHOT_ENABLED", "true")
+    monkeypatch.setenv("CATALOG_SNAPSHOT_FILE", str(tmp_path / "catalog.snap"))
+    first, second = create_product(), create_product(category="champu-solido")
+
+    listed = run(product_service.get_products(category="champu-solido")).items
+    assert ids_of(listed) == [str(second.id)]
+    assert isinstance(product_service._snapshot, MappedCatalogSnapshot)
+
+    # Another worker deactivates a product and publishes the file
+    run(db.update_one("products", {"_id": second.id}, {"is_active": False}))
+    run(product_service.publish_snapshot_file())
+
+    # As the listing endpoints do before answering
+    assert product_service.serves_from_snapshot("es", None)
+    assert run(product_service.get_products(category="champu-solido")).items == []
+    assert ids_of(run(product_service.get_views_by_ids([str(first.id), str(second.id)], "es"))) == [str(first.id)]
@@ -0,0 +1,59 @@
+from models.category import CategoryCreate
+from services.category_service import category_service
+from services.fast_json import loads
+
+
+def category(category_id: str, **overrides) -> CategoryCreate:
+    return CategoryCreate(**dict(
+        {"categoryId": category_id, "name": {"es": "Cepillos", "en": "Brushes"}, "icon": "brush"},
+        **overrides
+    ))
+
+
+def test_payloads_are_served_from_memory_until_invalidated(run, db):
+    run(category_service.create_category(category("cepillos-bambu")))
+    payload, etag = run(category_service.get_categories_payload("en"))
+    assert loads(payload) == [{"id": "cepillos-bambu", "name": "Brushes", "icon": "brush"}]
+
+    # Edited behind the service's back: not seen while the payloads are held
+    run(db.insert_one("categories", {"category_id": "champu", "name": {"es": "Champú", "en": "Shampoo"},
+                                     "icon": "bottle", "is_active": True}))
+    category_service._loaded_at -= 24 * 3600
+    assert run(category_service.get_categories_payload("en")) == (payload, etag)
+
+    category_service.invalidate()
+    payload, fresh_etag = run(category_service.get_categories_payload("en"))
+    assert [item["id"] for item in loads(payload)] == ["cepillos-bambu", "champu"]
+    assert fresh_etag != etag
+
+
+def test_writes_and_bus_events_rebuild_the_payloads(run, db):
+    run(category_service.create_category(category("cepillos-bambu")))
+    _, etag = run(category_service.get_categories_payload())
+
+    run(category_service.create_category(category("champu", icon="bottle")))
+    payload, created_etag = run(category_service.get_categories_payload())
+    assert created_etag != etag and len(loads(payload)) == 2
+
+    run(db.update_one("categories", {"category_id": "champu"}, {"is_active": False}))
+    run(category_service.apply_change({"kind": "categories", "category_id": "champu"}))
+    payload, _ = run(category_service.get_categories_payload())
+    assert [item["id"] for item in loads(payload)] == ["cepillos-bambu"]
+
+
+def test_optional_ttl_reloads(run, db, monkeypatch):
+    monkeypatch.setenv("CATEGORIES_CACHE_TTL", "60")
+    run(category_service.create_category(category("cepillos-bambu")))
+    run(category_service.get_categories_payload())
+    run(db.insert_one("categories", {"category_id": "champu", "name": {"es": "Champú", "en": "Shampoo"},
+                                     "icon": "bottle", "is_active": True}))
+
+    category_service._loaded_at -= 61
+    payload, _ = run(category_service.get_categories_payload())
+    assert len(loads(payload)) == 2
+
+
+def test_unknown_language_gets_the_default_payload(run, db):
+    run(category_service.create_category(category("cepillos-bambu")))
+
+    assert run(category_service.get_categories_payload("fr")) == run(category_service.get_categories_payload("es"))
@@ -0,0 +1,122 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from services import compression
+from services.compression import CompressedBodyCache, CompressionMiddleware, negotiate
+
+LARGE = [{"id": str(position), "name": "Cepillo de bambú"} for position in range(200)]
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("gzip;q=0", None),
+    ("*;q=0", None),
+    ("gzip;q=nonsense", None),
+    ("deflate", None),
+    ("", None),
+])
+def test_negotiate_honours_q_values(gzip_only, header, expected):
+    assert negotiate(header) == expected
+
+
+def test_negotiate_prefers_brotli_when_installed(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+
+    assert negotiate("gzip, br") == "br"
+    assert negotiate("gzip, br;q=0") == "gzip"
+
+
+def test_body_cache_is_bounded_by_entries_and_bytes():
+    cache = CompressedBodyCache(max_entries=2, max_bytes=10)
+    cache.put("a", "gzip", b"1234")
+    cache.put("b", "gzip", b"1234")
+    assert cache.get("a", "gzip") == b"1234"  # now most recently used
+
+    cache.put("c", "gzip", b"1234")
+    assert cache.get("b", "gzip") is None
+    assert cache.get("a", "gzip") == b"1234"
+
+    cache.put("d", "gzip", b"12345678")
+    assert cache.size <= 10 and cache.get("d", "gzip") == b"12345678"
+
+    cache.put("huge", "gzip", b"x" * 11)
+    assert cache.get("huge", "gzip") is None
+
+
+def client(cache: CompressedBodyCache) -> TestClient:
+    async def products(request):
+        return JSONResponse(LARGE, headers={"ETag": 'W/"v-1"'})
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def text(request):
+        return PlainTextResponse("x" * 4096)
+
+    async def origin(request):
+        return JSONResponse({"ok": True}, headers={"Vary": "Origin"})
+
+    app = Starlette(routes=[
+        Route("/products", products), Route("/small", small), Route("/text", text), Route("/origin", origin)
+    ])
+    app.add_middleware(CompressionMiddleware, cache=cache)
+    return TestClient(app)
+
+
+def test_middleware_compresses_large_json_and_reuses_it_by_etag(gzip_only):
+    cache = CompressedBodyCache()
+    with client(cache) as http:
+        first = http.get("/products", headers={"Accept-Encoding": "gzip"})
+        assert first.headers["content-encoding"] == "gzip"
+        assert first.headers["vary"] == "Accept-Encoding"
+        assert first.json() == LARGE
+
+        compressed = cache.get('W/"v-1"', "gzip")
+        assert gzip.decompress(compressed) == first.content
+        second = http.get("/products", headers={"Accept-Encoding": "gzip"})
+        assert second.json() == LARGE
+        assert cache.get('W/"v-1"', "gzip") is compressed
+
+
+def test_middleware_leaves_small_and_unaccepted_responses_alone(gzip_only):
+    with client(CompressedBodyCache()) as http:
+        assert "content-encoding" not in http.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        assert "content-encoding" not in http.get("/products", headers={"Accept-Encoding": "identity"}).headers
+        assert http.get("/text", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+
+
+@pytest.mark.parametrize("path, accept_encoding", [
+    ("/products", "gzip"),
+    ("/products", "identity"),
+    ("/small", "gzip"),
+    ("/small", "identity"),
+    ("/origin", "identity"),
+])
+def test_every_compressible_response_varies_on_accept_encoding(gzip_only, path, accept_encoding):
+    with client(CompressedBodyCache()) as http:
+        vary = http.get(path, headers={"Accept-Encoding": accept_encoding}).headers["vary"]
+
+    assert [part.strip() for part in vary.split(",")].count("Accept-Encoding") == 1
+
+
+def test_existing_vary_is_kept(gzip_only):
+    with client(CompressedBodyCache()) as http:
+        assert http.get("/origin", headers={"Accept-Encoding": "gzip"}).headers["vary"] == "Origin, Accept-Encoding"
+
+
+def test_middleware_can_be_disabled(gzip_only, monkeypatch):
+    monkeypatch.setenv("COMPRESSION_ENABLED", "false")
+    with client(CompressedBodyCache()) as http:
+        assert "content-encoding" not in http.get("/products", headers={"Accept-Encoding": "gzip"}).headers
@@ -0,0 +1,80 @@
+from typing import Any, List
+
+import pytest
+from pydantic import TypeAdapter
+
+from models.article import ArticleCreate, ArticleResponse, ArticleSummary
+from models.product import ProductResponse
+from services.article_service import article_service
+from services.fast_json import dumps, loads
+from services.favorite_service import favorite_service
+from services.product_service import product_service
+
+
+def without_nulls(value: Any) -> Any:
+    # The fast path omits unset optional fields (score) that response_model sends as null
+    if isinstance(value, dict):
+        return {key: without_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [without_nulls(item) for item in value]
+    return value
+
+
+def model_body(model, content: Any) -> Any:
+    """What FastAPI sends for ``content`` under ``response_model=model``."""
+    adapter = TypeAdapter(model)
+    return without_nulls(adapter.dump_python(adapter.validate_python(content), mode="json", by_alias=True))
+
+
+def fast_body(content: Any) -> Any:
+    return without_nulls(loads(dumps(content)))
+
+
+@pytest.fixture
+def article(run, db):
+    return run(article_service.create_article(ArticleCreate(
+        title={"es": "Guía del cepillo", "en": "Toothbrush guide"},
+        slug="guia-cepillo",
+        content={"es": "<p>Contenido</p>", "en": "<p>Content</p>"},
+        excerpt={"es": "Resumen", "en": "Summary"},
+        category="cepillos-bambu",
+        products=[{
+            "title": "Cepillo", "description": "De bambú",
+            "amazonLink": "https://amazon.example/brush", "position": 1
+        }],
+        featuredImage="https://example.com/guide.jpg",
+        tags=["bambu"],
+        author="Equipo",
+        seoTitle={"es": "Guía", "en": "Guide"},
+        seoDescription={"es": "Guía", "en": "Guide"}
+    )))
+
+
+def test_products_match_the_response_model(run, create_product):
+    create_product()
+    create_product(price=2.5, originalPrice=2.5)
+    items = run(product_service.get_products()).items
+
+    assert fast_body(items) == model_body(List[ProductResponse], items)
+
+
+def test_article_matches_the_response_model(run, article):
+    found = run(article_service.get_article_by_slug("guia-cepillo"))
+
+    body = fast_body(found)
+    assert body == model_body(ArticleResponse, found)
+    assert body["products"][0]["amazonLink"] == "https://amazon.example/brush"
+
+
+def test_article_summaries_match_the_response_model(run, article):
+    items = run(article_service.get_articles()).items
+
+    assert fast_body(items) == model_body(List[ArticleSummary], items)
+
+
+def test_favorite_cards_match_the_response_model(run, create_product):
+    product = create_product()
+    run(favorite_service.add_favorite("user-1", str(product.id)))
+    items = run(favorite_service.get_favorites("user-1", expand=True)).items
+
+    assert fast_body(items) == model_body(List[ProductResponse], items)
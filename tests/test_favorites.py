@@ -0,0 +1,113 @@
+import asyncio
+
+from services.favorite_service import favorite_service
+from services.product_service import product_service
+
+
+def favorite_count(run, db, product) -> int:
+    return run(db.find_one("products", {"_id": product.id}))["favorite_count"]
+
+
+def test_add_is_idempotent_and_counted_once(run, db, create_product):
+    product = create_product()
+
+    assert run(favorite_service.add_favorite("user-1", str(product.id))) is True
+    assert run(favorite_service.add_favorite("user-1", str(product.id))) is False
+
+    assert run(favorite_service.get_favorites("user-1")).items == [str(product.id)]
+    assert favorite_count(run, db, product) == 1
+
+
+def test_remove_only_decrements_what_it_deleted(run, db, create_product):
+    product = create_product()
+    run(favorite_service.add_favorite("user-1", str(product.id)))
+
+    assert run(favorite_service.remove_favorite("user-1", str(product.id))) is True
+    assert run(favorite_service.remove_favorite("user-1", str(product.id))) is False
+    assert favorite_count(run, db, product) == 0
+
+
+def test_bulk_applies_adds_and_removes(run, db, create_product):
+    kept, dropped, added = create_product(), create_product(), create_product()
+    run(favorite_service.add_favorite("user-1", str(kept.id)))
+    run(favorite_service.add_favorite("user-1", str(dropped.id)))
+
+    result = run(favorite_service.apply_bulk(
+        "user-1",
+        add=[str(added.id), str(kept.id), str(added.id), "not-an-id"],
+        remove=[str(dropped.id), str(dropped.id)]
+    ))
+
+    assert result == {"added": 1, "removed": 1, "invalid": ["not-an-id"]}
+    assert set(run(favorite_service.get_favorites("user-1")).items) == {str(kept.id), str(added.id)}
+    assert [favorite_count(run, db, product) for product in (kept, dropped, added)] == [1, 0, 1]
+
+
+def test_concurrent_bulk_removes_decrement_once(run, db, create_product):
+    product = create_product()
+    run(favorite_service.add_favorite("user-1", str(product.id)))
+
+    async def remove_twice():
+        return await asyncio.gather(
+            favorite_service.apply_bulk("user-1", add=[], remove=[str(product.id)]),
+            favorite_service.apply_bulk("user-1", add=[], remove=[str(product.id)])
+        )
+
+    results = run(remove_twice())
+
+    assert sorted(result["removed"] for result in results) == [0, 1]
+    assert favorite_count(run, db, product) == 0
+
+
+def test_bulk_with_a_row_in_both_lists_adds_it(run, db, create_product):
+    product = create_product()
+
+    result = run(favorite_service.apply_bulk("user-1", add=[str(product.id)], remove=[str(product.id)]))
+
+    assert result["added"] == 1 and result["removed"] == 0
+
+
+def test_favorites_page_with_a_cursor(run, db, create_product):
+    products = [create_product() for _ in range(5)]
+    for product in products:
+        run(favorite_service.add_favorite("user-1", str(product.id)))
+
+    first = run(favorite_service.get_favorites("user-1", limit=3))
+    second = run(favorite_service.get_favorites("user-1", limit=3, cursor=first.next_cursor))
+
+    assert len(first.items) == 3 and len(second.items) == 2
+    assert set(first.items + second.items) == {str(product.id) for product in products}
+
+
+def test_favorites_refresh_cached_cards_and_popular_listings(run, db, create_product):
+    quiet, liked = create_product(), create_product()
+    assert run(product_service.get_products(sort="popular")).items[0]["favoriteCount"] == 0
+    assert run(product_service.get_products()).items[1]["favoriteCount"] == 0
+
+    run(favorite_service.add_favorite("user-1", str(liked.id)))
+
+    popular = run(product_service.get_products(sort="popular")).items
+    assert [item["id"] for item in popular] == [str(liked.id), str(quiet.id)]
+    assert run(product_service.get_products()).items[1]["favoriteCount"] == 1
+
+
+def test_favorites_leave_the_catalog_version_and_snapshot_alone(run, db, create_product, monkeypatch):
+    monkeypatch.setenv("CATALOG_SNAPSHOT_ENABLED", "true")
+    product = create_product()
+    run(product_service.get_products())
+    version, snapshot = product_service.catalog_version, product_service._snapshot
+
+    run(favorite_service.add_favorite("user-1", str(product.id)))
+    run(favorite_service.apply_bulk("user-1", add=[], remove=[str(product.id)]))
+
+    assert product_service.catalog_version == version
+    assert product_service._snapshot is snapshot
+
+
+def test_reconcile_repairs_drifted_counts(run, db, create_product):
+    product = create_product()
+    run(favorite_service.add_favorite("user-1", str(product.id)))
+    run(db.update_one("products", {"_id": product.id}, {"favorite_count": 42}))
+
+    assert run(favorite_service.reconcile_favorite_counts()) == 1
+    assert favorite_count(run, db, product) == 1
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from services.http_cache import ConditionalGetMiddleware, conditional_get, http_date, is_fresh, version_etag
+
+CHANGED_AT = datetime(2026, 3, 1, 12, 0, 0, 250000)
+
+
+def request_with(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/products",
+        "query_string": b"",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_http_date_rounds_up_to_the_next_second():
+    assert http_date(CHANGED_AT) == "Sun, 01 Mar 2026 12:00:01 GMT"
+    assert http_date(CHANGED_AT.replace(microsecond=0)) == "Sun, 01 Mar 2026 12:00:00 GMT"
+
+
+def test_etag_match_is_weak_and_accepts_lists():
+    etag = version_etag("/api/products", 3)
+
+    assert is_fresh(request_with(if_none_match=etag.removeprefix("W/")), etag)
+    assert is_fresh(request_with(if_none_match=f'"other", {etag}'), etag)
+    assert is_fresh(request_with(if_none_match="*"), etag)
+    assert not is_fresh(request_with(if_none_match=version_etag("/api/products", 4)), etag)
+
+
+def test_if_modified_since_is_ignored_when_there_is_an_etag():
+    etag = version_etag("/api/products", 3)
+    last_modified = http_date(CHANGED_AT)
+
+    # Another worker's copy: same second, different catalog version
+    assert not is_fresh(request_with(if_modified_since=last_modified), etag, last_modified)
+    assert not is_fresh(
+        request_with(if_modified_since=last_modified, if_none_match='W/"stale"'), etag, last_modified
+    )
+
+
+def test_if_modified_since_without_an_etag():
+    last_modified = http_date(CHANGED_AT)
+
+    assert is_fresh(request_with(if_modified_since=last_modified), None, last_modified)
+    assert is_fresh(request_with(if_modified_since="Mon, 02 Mar 2026 00:00:00 GMT"), None, last_modified)
+    assert not is_fresh(request_with(if_modified_since="Sun, 01 Mar 2026 11:00:00 GMT"), None, last_modified)
+    assert not is_fresh(request_with(if_modified_since="yesterday"), None, last_modified)
+
+
+def test_conditional_get_sets_validators_or_answers_304():
+    etag, last_modified = version_etag("/api/products", 3), http_date(CHANGED_AT)
+
+    response = Response()
+    assert conditional_get(request_with(), response, etag, last_modified) is None
+    assert response.headers["etag"] == etag and response.headers["last-modified"] == last_modified
+
+    unchanged = conditional_get(request_with(if_none_match=etag), Response(), etag, last_modified)
+    assert unchanged.status_code == 304
+    assert unchanged.headers["cache-control"].startswith("public, max-age=60")
+
+
+def test_conditional_get_is_off_with_the_http_cache(monkeypatch):
+    monkeypatch.setenv("HTTP_CACHE_ENABLED", "false")
+    etag = version_etag("/api/products", 3)
+
+    response = Response()
+    assert conditional_get(request_with(if_none_match=etag), response, etag, http_date(CHANGED_AT)) is None
+    assert "etag" not in response.headers and "last-modified" not in response.headers
+
+
+def client() -> TestClient:
+    async def products(request):
+        return JSONResponse([{"id": "1"}])
+
+    async def elsewhere(request):
+        return JSONResponse({"ok": True})
+
+    app = Starlette(routes=[Route("/api/products", products), Route("/api/other", elsewhere)])
+    app.add_middleware(ConditionalGetMiddleware)
+    return TestClient(app)
+
+
+def test_middleware_answers_304_for_a_matching_body_etag():
+    with client() as http:
+        first = http.get("/api/products")
+        assert first.status_code == 200
+        assert first.headers["cache-control"].startswith("public, max-age=60")
+
+        again = http.get("/api/products", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_middleware_skips_other_routes_and_can_be_disabled(monkeypatch):
+    with client() as http:
+        assert "etag" not in http.get("/api/other").headers
+        monkeypatch.setenv("HTTP_CACHE_ENABLED", "false")
+        assert "etag" not in http.get("/api/products").headers
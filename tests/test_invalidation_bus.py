@@ -0,0 +1,165 @@
+import asyncio
+
+from bson import ObjectId
+
+from services import invalidation_bus as bus_module
+from services.database import db_service
+from services.invalidation_bus import CappedCollectionTransport, InvalidationBus, LocalTransport
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def workers(count: int):
+    transport = LocalTransport()
+    buses = [InvalidationBus(transport) for _ in range(count)]
+    received = [[] for _ in buses]
+    for bus, events in zip(buses, received):
+        async def handler(event, events=events):
+            events.append(event["product_id"])
+        bus.on("products", handler)
+    return buses, received
+
+
+def test_events_reach_every_other_worker(run):
+    buses, received = workers(3)
+
+    async def scenario():
+        for bus in buses:
+            await bus.start()
+        await settle()
+        await buses[0].publish("products", product_id="a")
+        await buses[2].publish("products", product_id="b")
+        await buses[1].publish("categories", category_id="c")
+        await settle()
+        for bus in buses:
+            await bus.stop()
+
+    run(scenario())
+
+    assert received == [["b"], ["a", "b"], ["a"]]
+    assert [bus.stats()["received"] for bus in buses] == [2, 2, 2]
+    assert [bus.stats()["published"] for bus in buses] == [1, 1, 1]
+
+
+def test_a_failing_handler_does_not_stop_the_others(run):
+    buses, received = workers(2)
+
+    async def broken(event):
+        raise RuntimeError("boom")
+
+    buses[1].on("products", broken)
+
+    async def scenario():
+        for bus in buses:
+            await bus.start()
+        await settle()
+        await buses[0].publish("products", product_id="a")
+        await buses[0].publish("products", product_id="b")
+        await settle()
+        for bus in buses:
+            await bus.stop()
+
+    run(scenario())
+
+    assert received[1] == ["a", "b"]
+    assert buses[1].stats()["errors"] == 2
+
+
+class FakeCursor:
+    """Tailable cursor over a snapshot of the collection that dies once read."""
+
+    def __init__(self, documents):
+        self.documents = list(documents)
+        self.alive = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.documents:
+            self.alive = False
+            raise StopAsyncIteration
+        return self.documents.pop(0)
+
+
+class FakeCappedCollection:
+    def __init__(self, documents, on_reopen=()):
+        # Natural order, which is insertion order
+        self.documents = list(documents)
+        # Writes made by other workers before each cursor reopen
+        self.on_reopen = list(on_reopen)
+
+    async def find_one(self, filter_dict, sort=None, projection=None):
+        return self.documents[-1] if self.documents else None
+
+    async def count_documents(self, filter_dict, limit=0):
+        return sum(1 for document in self.documents if document["_id"] == filter_dict["_id"])
+
+    def find(self, filter_dict, cursor_type=None):
+        assert filter_dict == {}, "resuming must not filter on _id order"
+        if self.on_reopen:
+            self.on_reopen.pop(0)()
+        return FakeCursor(self.documents)
+
+
+def capped_events(monkeypatch, collection, transport=None):
+    async def get_collection(name):
+        return collection
+
+    monkeypatch.setattr(db_service, "get_collection", get_collection)
+    monkeypatch.setattr(bus_module, "RETRY_SECONDS", 0)
+    transport = transport or CappedCollectionTransport()
+
+    async def read(count):
+        events = []
+        async for event in transport.events():
+            events.append(event["name"])
+            if len(events) == count:
+                return events
+
+    return read
+
+
+def test_capped_transport_resumes_in_insertion_order(run, monkeypatch):
+    started = {"_id": ObjectId(), "name": "before start"}
+    # Two workers' ids: the later insert carries the smaller ObjectId
+    smaller, larger = ObjectId(), ObjectId()
+    collection = FakeCappedCollection([started], on_reopen=[
+        lambda: None,
+        lambda: collection.documents.append({"_id": larger, "name": "first"}),
+        lambda: collection.documents.append({"_id": smaller, "name": "second"}),
+    ])
+
+    read = capped_events(monkeypatch, collection)
+
+    assert run(read(2)) == ["first", "second"]
+
+
+def test_capped_transport_reads_everything_after_a_roll_off(run, monkeypatch):
+    # The last event read rolls off as the cursor reopens, after any check made before it
+    started = {"_id": ObjectId(), "name": "before start"}
+
+    def roll_over():
+        collection.documents = [{"_id": ObjectId(), "name": "a"}, {"_id": ObjectId(), "name": "b"}]
+
+    collection = FakeCappedCollection([started], on_reopen=[lambda: None, roll_over])
+
+    read = capped_events(monkeypatch, collection)
+
+    assert run(read(2)) == ["a", "b"]
+
+
+def test_capped_transport_resumes_after_a_listener_restart(run, monkeypatch):
+    collection = FakeCappedCollection([{"_id": ObjectId(), "name": "before start"}], on_reopen=[
+        lambda: collection.documents.append({"_id": ObjectId(), "name": "first"})
+    ])
+    transport = CappedCollectionTransport()
+    read = capped_events(monkeypatch, collection, transport)
+
+    assert run(read(1)) == ["first"]
+
+    collection.documents.append({"_id": ObjectId(), "name": "while restarting"})
+    assert run(read(1)) == ["while restarting"]
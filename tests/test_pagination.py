@@ -0,0 +1,119 @@
+import base64
+
+import pytest
+from bson import ObjectId
+
+from services.pagination import InvalidCursor, cursor_after, decode_cursor, encode_cursor, keyset_filter
+from services.product_service import product_service
+
+PRICE_DESC = [("price", -1), ("_id", -1)]
+MIXED = [("price", 1), ("rating", -1), ("_id", 1)]
+
+
+def test_cursor_round_trip_keeps_value_types():
+    product_id = ObjectId()
+    cursor = encode_cursor(PRICE_DESC, [9.5, product_id])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, PRICE_DESC) == [9.5, product_id]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    "ñandú",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+    base64.urlsafe_b64encode(b'{"k": ["price", "_id"]}').decode("ascii"),
+    base64.urlsafe_b64encode(b'{"k": ["price", "_id"], "v": [1]}').decode("ascii"),
+    base64.urlsafe_b64encode(b'["price", "_id"]').decode("ascii"),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, PRICE_DESC)
+
+
+def test_cursor_from_another_sort_is_rejected():
+    cursor = encode_cursor([("rating", -1), ("_id", -1)], [4.5, ObjectId()])
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, PRICE_DESC)
+
+
+def test_keyset_filter_single_key():
+    product_id = ObjectId()
+
+    assert keyset_filter([("_id", 1)], [product_id]) == {"_id": {"$gt": product_id}}
+
+
+def test_keyset_filter_mixed_directions():
+    product_id = ObjectId()
+
+    assert keyset_filter(MIXED, [10, 4.5, product_id]) == {"$or": [
+        {"price": {"$gt": 10}},
+        {"price": 10, "$or": [{"rating": {"$lt": 4.5}}, {"rating": None}]},
+        {"price": 10, "rating": 4.5, "_id": {"$gt": product_id}},
+    ]}
+
+
+def test_keyset_filter_after_a_null_key():
+    product_id = ObjectId()
+
+    # Ascending: nulls come first, so every non-null value follows
+    assert keyset_filter([("discount", 1), ("_id", 1)], [None, product_id]) == {"$or": [
+        {"discount": {"$ne": None}},
+        {"discount": None, "_id": {"$gt": product_id}},
+    ]}
+    # Descending: nulls come last, so only other nulls follow
+    assert keyset_filter([("discount", -1), ("_id", -1)], [None, product_id]) == {
+        "discount": None, "_id": {"$lt": product_id}
+    }
+
+
+def test_cursor_after_only_on_full_pages():
+    documents = [{"price": 3, "_id": ObjectId()}, {"price": 2, "_id": ObjectId()}]
+
+    assert cursor_after(PRICE_DESC, documents, limit=3) is None
+    cursor = cursor_after(PRICE_DESC, documents, limit=2)
+    assert decode_cursor(cursor, PRICE_DESC) == [2, documents[-1]["_id"]]
+
+
+def test_keyset_pages_cover_every_row_once(run, create_product):
+    for price in [5, 3, 5, 8, 3, 1]:
+        create_product(price=price)
+
+    seen, cursor = [], None
+    while True:
+        page = run(product_service.get_products(limit=2, cursor=cursor, sort="price-desc"))
+        seen.extend(item["id"] for item in page.items)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+
+    everything = run(product_service.get_products(limit=50, sort="price-desc"))
+    assert seen == [item["id"] for item in everything.items]
+    assert len(set(seen)) == 6
+
+
+def test_keyset_pages_include_rows_missing_the_sort_key(run, db, create_product):
+    for count in [3, 0, 7]:
+        created = create_product()
+        run(db.update_one("products", {"_id": created.id}, {"favorite_count": count}))
+    for _ in range(3):
+        legacy = create_product()
+        run(db.update_one("products", {"_id": legacy.id}, {"favorite_count": None}))
+
+    seen, cursor = [], None
+    while True:
+        page = run(product_service.get_products(limit=2, cursor=cursor, sort="popular"))
+        seen.extend(item["id"] for item in page.items)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 6
+
+
+def test_text_search_rejects_cursors(run, db):
+    cursor = encode_cursor(product_service.listing_sort, [ObjectId()])
+
+    with pytest.raises(InvalidCursor):
+        run(product_service.get_products(search="bambu", search_mode="text", cursor=cursor))
@@ -0,0 +1,62 @@
+from bson import ObjectId
+
+from services.product_service import product_service
+from services.localization import LOCALIZED_FIELD, SEARCH_TEXT_FIELD
+
+from .conftest import product_payload
+
+
+def test_listing_projection_reads_one_view_and_sort_fields():
+    projection = product_service.listing_projection("es")
+
+    assert projection[f"{LOCALIZED_FIELD}.es"] == 1
+    assert f"{LOCALIZED_FIELD}.en" not in projection
+    assert SEARCH_TEXT_FIELD not in projection
+    assert "name" not in projection and "description" not in projection
+    for sort_spec in product_service.sorts.values():
+        for field, _ in sort_spec:
+            assert field in projection
+
+
+def test_listing_returns_stored_views(run, create_product):
+    created = create_product(name={"es": "Champú sólido", "en": "Solid shampoo"}, category="champu-solido")
+
+    page = run(product_service.get_products(category="champu-solido", language="en"))
+
+    assert [item["id"] for item in page.items] == [str(created.id)]
+    assert page.items[0]["name"] == "Solid shampoo"
+
+
+def test_listing_localizes_documents_without_a_stored_view(run, db):
+    payload = product_payload()
+    legacy = {
+        "_id": ObjectId(),
+        "name": payload["name"],
+        "description": payload["description"],
+        "category": payload["category"],
+        "price": payload["price"],
+        "original_price": payload["originalPrice"],
+        "image": payload["image"],
+        "amazon_link": payload["amazonLink"],
+        "rating": payload["rating"],
+        "reviews": payload["reviews"],
+        "features": payload["features"],
+        "is_active": True,
+    }
+    run(db.insert_one("products", legacy))
+
+    page = run(product_service.get_products(language="es"))
+
+    assert page.items[0]["id"] == str(legacy["_id"])
+    assert page.items[0]["name"] == "Cepillo de bambú"
+    assert page.items[0]["amazonLink"] == "https://amazon.example/brush"
+
+
+def test_unknown_languages_get_the_default_one(run, db, create_product):
+    product = create_product()
+
+    items, missing = run(product_service.get_products_batch([str(product.id)], "fr"))
+    assert [item["name"] for item in items] == ["Cepillo de bambú"] and missing == []
+
+    page = run(product_service.get_faceted_products(language="fr"))
+    assert page.total == 1 and page.items[0]["name"] == "Cepillo de bambú"
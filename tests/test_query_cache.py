@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from services import query_cache as query_cache_module
+from services.query_cache import QueryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls the time the cache sees, without touching the event loop's clock."""
+    now = [1000.0]
+
+    class Clock:
+        @staticmethod
+        def monotonic():
+            return now[0]
+
+    monkeypatch.setattr(query_cache_module, "time", Clock)
+    return now
+
+
+def loader(values):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return values[len(calls) - 1]
+
+    return load, calls
+
+
+def no_tags(value):
+    return ()
+
+
+def test_fresh_entries_are_served_without_loading(run, clock):
+    cache = QueryCache()
+    load, calls = loader(["first", "second"])
+
+    assert run(cache.get(("products.get_products", 1), load, no_tags)) == "first"
+    clock[0] += 29
+    assert run(cache.get(("products.get_products", 1), load, no_tags)) == "first"
+    assert len(calls) == 1 and cache.hits == 1
+
+
+def test_stale_entries_are_served_while_one_refresh_runs(run, clock):
+    cache = QueryCache()
+    load, calls = loader(["first", "second"])
+    key = ("products.get_products", 1)
+    run(cache.get(key, load, no_tags))
+    clock[0] += 60
+
+    async def stale_burst():
+        results = await asyncio.gather(*[cache.get(key, load, no_tags) for _ in range(5)])
+        await asyncio.sleep(0)
+        return results
+
+    assert run(stale_burst()) == ["first"] * 5
+    assert len(calls) == 2 and cache.stale_hits == 5 and cache.refreshes == 1
+    assert run(cache.get(key, load, no_tags)) == "second"
+
+
+def test_expired_entries_load_again(run, clock):
+    cache = QueryCache()
+    load, calls = loader(["first", "second"])
+    key = ("products.get_products", 1)
+    run(cache.get(key, load, no_tags))
+    clock[0] += 30 + 300 + 1
+
+    assert run(cache.get(key, load, no_tags)) == "second"
+    assert cache.misses == 2
+
+
+def test_tags_drop_dependent_entries_only(run, clock):
+    cache = QueryCache()
+    brush, shampoo = loader(["brush", "brush v2"]), loader(["shampoo"])
+    run(cache.get(("products.get_products", "brush"), brush[0], lambda value: ["category:cepillos"]))
+    run(cache.get(("products.get_products", "shampoo"), shampoo[0], lambda value: ["category:champu"]))
+
+    cache.invalidate("category:cepillos")
+
+    assert run(cache.get(("products.get_products", "brush"), brush[0], no_tags)) == "brush v2"
+    assert run(cache.get(("products.get_products", "shampoo"), shampoo[0], no_tags)) == "shampoo"
+    assert len(shampoo[1]) == 1
+
+
+def test_load_racing_an_invalidation_is_not_kept(run, clock):
+    cache = QueryCache()
+    key = ("products.get_products", 1)
+
+    async def load():
+        cache.invalidate("products:all")
+        return "read before the write"
+
+    run(cache.get(key, load, no_tags))
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_and_bytes_are_bounded(run, clock, monkeypatch):
+    monkeypatch.setenv("QUERY_CACHE_MAX_ENTRIES", "2")
+    cache = QueryCache()
+
+    async def value():
+        return "x"
+
+    for position in range(3):
+        run(cache.get(("products.get_products", position), value, no_tags))
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+    monkeypatch.setenv("QUERY_CACHE_MAX_BYTES", "100")
+
+    async def large():
+        return "x" * 200
+
+    run(cache.get(("products.get_products", "large"), large, no_tags))
+    assert ("products.get_products", "large") not in cache._entries
+    assert cache.size <= 100
+
+
+def test_zero_ttl_disables_a_method(run, clock, monkeypatch):
+    monkeypatch.setenv("QUERY_CACHE_ARTICLES_GET_ARTICLES_TTL", "0")
+    cache = QueryCache()
+    load, calls = loader(["first", "second"])
+
+    run(cache.get(("articles.get_articles", 1), load, no_tags))
+    run(cache.get(("articles.get_articles", 1), load, no_tags))
+    assert len(calls) == 2
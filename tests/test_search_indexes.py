@@ -0,0 +1,74 @@
+from bson import ObjectId
+
+from services.database import db_service
+from services.fuzzy_index import FuzzyIndex
+from services.search_engine import PendingWrites, SearchEngine
+from services.search_indexes import SearchIndexes
+from services.suggest_index import SuggestIndex
+
+from .conftest import product_payload
+
+
+def product_document(**overrides) -> dict:
+    payload = product_payload(**overrides)
+    return {"_id": ObjectId(), "name": payload["name"], "description": payload["description"],
+            "features": payload["features"], "category": payload["category"], "reviews": 0, "is_active": True}
+
+
+def test_pending_writes_replay_only_while_collecting():
+    pending, applied = PendingWrites(), []
+
+    def write(value, indexes):
+        applied.append((value, indexes))
+
+    pending.record("products", write, "ignored")
+    with pending.collecting():
+        pending.record("products", write, 1)
+        pending.record("articles", write, 2)
+        pending.replay({"products": "new products", "articles": "new articles"})
+    pending.record("products", write, "ignored")
+
+    assert applied == [(1, "new products"), (2, "new articles")]
+
+
+def test_writes_during_a_build_reach_the_new_indexes(run, db, monkeypatch):
+    run(db.insert_one("products", product_document()))
+    late = product_document(name={"es": "Champú sólido", "en": "Solid shampoo"})
+    engine, fuzzy, suggest = SearchEngine(), FuzzyIndex(), SuggestIndex()
+    indexes = SearchIndexes(engine, fuzzy, suggest)
+    find_many = db_service.find_many
+
+    async def find_many_then_write(collection_name, *args, **kwargs):
+        documents = await find_many(collection_name, *args, **kwargs)
+        if collection_name == "products":
+            # Written by a request while the builds are loading
+            indexes.index_product(late)
+        return documents
+
+    monkeypatch.setattr(db_service, "find_many", find_many_then_write)
+    run(engine.build())
+    run(fuzzy.build())
+    run(suggest.build())
+
+    assert engine.search_products("champu", "es") == [str(late["_id"])]
+    assert "champu" in fuzzy.products["es"].doc_words[str(late["_id"])]
+    assert run(suggest.suggest("champu"))[0]["id"] == str(late["_id"])
+
+
+def test_fan_out_skips_writes_an_index_does_not_handle():
+    calls = []
+
+    class ProductsOnly:
+        def index_product(self, product_data):
+            calls.append(("products", product_data["_id"]))
+
+    class Everything(ProductsOnly):
+        def index_category(self, category_data):
+            calls.append(("categories", category_data["category_id"]))
+
+    indexes = SearchIndexes(ProductsOnly(), Everything())
+    indexes.index_product({"_id": 1})
+    indexes.index_category({"category_id": "champu"})
+    indexes.remove_product("1")
+
+    assert calls == [("products", 1), ("products", 1), ("categories", "champu")]
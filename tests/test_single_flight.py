@@ -0,0 +1,99 @@
+import asyncio
+
+from services.single_flight import SingleFlight, freeze, single_flight
+
+
+def test_freeze_normalizes_argument_order():
+    assert freeze({"b": [1, 2], "a": {"y": 1, "x": 2}}) == freeze({"a": {"x": 2, "y": 1}, "b": [1, 2]})
+    assert freeze({1, 2}) == freeze({2, 1})
+    assert freeze([1, 2]) != freeze([2, 1])
+
+
+def test_concurrent_calls_share_one_execution(run):
+    flight = SingleFlight("test")
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"items": [1, 2]}
+
+    async def burst():
+        return await asyncio.gather(*[flight.run("key", load) for _ in range(10)])
+
+    results = run(burst())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["coalesced"] == 9 and flight.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_kept(run):
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def burst():
+        return await asyncio.gather(*[flight.run("key", fail) for _ in range(3)], return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in run(burst()))
+
+    async def succeed():
+        return "ok"
+
+    assert run(flight.run("key", succeed)) == "ok"
+
+
+def test_cancelled_caller_does_not_cancel_the_flight(run):
+    flight = SingleFlight("test")
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.run("key", load))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.run("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert run(scenario()) == "done"
+    assert flight.executions == 1
+
+
+def test_ttl_keeps_results_until_cleared(run):
+    flight = SingleFlight("test", ttl=60)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return len(calls)
+
+    assert run(flight.run("key", load)) == 1
+    assert run(flight.run("key", load)) == 1
+    flight.clear()
+    assert run(flight.run("key", load)) == 2
+
+
+def test_decorator_keys_on_bound_arguments(run, monkeypatch):
+    calls = []
+
+    class Service:
+        @single_flight("test.lookup", ttl=60)
+        async def lookup(self, term, language="es"):
+            calls.append((term, language))
+            return term
+
+    service = Service()
+    run(service.lookup("bambu"))
+    run(service.lookup("bambu", language="es"))
+    run(service.lookup(term="bambu", language="en"))
+    assert calls == [("bambu", "es"), ("bambu", "en")]
+
+    monkeypatch.setenv("SINGLE_FLIGHT_ENABLED", "false")
+    run(service.lookup("bambu"))
+    assert len(calls) == 3
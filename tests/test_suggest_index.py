@@ -0,0 +1,108 @@
+from bson import ObjectId
+
+from services import suggest_index as suggest_index_module
+from services.suggest_index import PrefixIndex, SuggestIndex
+
+WORDS = ["bambu", "cepillo", "champu", "solido", "jabon", "natural", "kit", "viaje", "algodon", "organico"]
+
+
+def synthetic_products(count: int):
+    for number in range(count):
+        words = [WORDS[(number + offset) % len(WORDS)] for offset in range(3)]
+        name = " ".join(words) + f" {number}"
+        yield {"_id": ObjectId(), "name": {"es": name, "en": name}, "reviews": number % 500, "is_active": True}
+
+
+def test_prefix_matches_any_word_start_and_folds_accents():
+    index = PrefixIndex()
+    index.add("product", "1", "Cepillo de Dientes de Bambú")
+
+    assert [hit["id"] for hit in index.suggest("bambu", 5)] == ["1"]
+    assert [hit["id"] for hit in index.suggest("CEPI", 5)] == ["1"]
+    assert index.suggest("ambu", 5) == []
+    assert index.suggest("  ", 5) == []
+
+
+def test_ranking_prefers_leading_matches_then_kind_then_popularity():
+    index = PrefixIndex()
+    index.add("article", "guia", "Guía del bambú")
+    index.add("product", "popular", "Bambú cepillo", popularity=900)
+    index.add("product", "niche", "Bambú peine", popularity=3)
+    index.add("category", "cepillos-bambu", "Bambú")
+
+    assert [hit["id"] for hit in index.suggest("bam", 10)] == ["cepillos-bambu", "popular", "niche", "guia"]
+
+
+def test_readding_and_removing_keep_keys_consistent():
+    index = PrefixIndex()
+    index.add("product", "1", "Champú sólido")
+    index.add("product", "1", "Jabón natural")
+
+    assert index.suggest("champu", 5) == []
+    assert [hit["text"] for hit in index.suggest("jab", 5)] == ["Jabón natural"]
+
+    index.remove("product", "1")
+    assert index.keys == [] and len(index) == 0
+
+
+def test_bulk_load_matches_incremental_inserts():
+    products = list(synthetic_products(300))
+    incremental, bulk = PrefixIndex(), PrefixIndex()
+    bulk.defer_sorting()
+    for product in products:
+        incremental.add("product", str(product["_id"]), product["name"]["es"], product["reviews"])
+        bulk.add("product", str(product["_id"]), product["name"]["es"], product["reviews"])
+    bulk.finish_sorting()
+
+    assert bulk.keys == incremental.keys
+    assert bulk.suggest("champu", 8) == incremental.suggest("champu", 8)
+
+
+def test_build_indexes_products_categories_and_articles(run, db):
+    products = list(synthetic_products(50))
+    for product in products:
+        run(db.insert_one("products", product))
+    run(db.insert_one("categories", {
+        "category_id": "champu-solido", "name": {"es": "Champús Sólidos", "en": "Solid Shampoos"}, "is_active": True
+    }))
+    run(db.insert_one("articles", {
+        "slug": "guia-champu", "title": {"es": "Guía del champú", "en": "Shampoo guide"}, "is_published": True
+    }))
+    index = SuggestIndex()
+
+    run(index.build())
+
+    hits = run(index.suggest("champu", language="es", limit=3))
+    assert hits[0] == {"type": "category", "id": "champu-solido", "text": "Champús Sólidos"}
+    assert [hit["id"] for hit in run(index.suggest("shampoo", language="en", limit=8))] == [
+        "guia-champu", "champu-solido"
+    ]
+    assert any(hit["type"] == "article" for hit in run(index.suggest("guia", language="es")))
+    assert all(index.keys == sorted(index.keys) for index in index.indexes.values())
+
+
+def test_build_sorts_once_instead_of_inserting_in_place(run, db, monkeypatch):
+    products = list(synthetic_products(300))
+    for product in products:
+        run(db.insert_one("products", product))
+    incremental = PrefixIndex()
+    for product in products:
+        incremental.add("product", str(product["_id"]), product["name"]["es"], product["reviews"])
+
+    sorts = []
+    real_finish = PrefixIndex.finish_sorting
+
+    def finish_sorting(self):
+        sorts.append(self)
+        real_finish(self)
+
+    def insort(*args, **kwargs):
+        raise AssertionError("build() must not insert keys one by one")
+
+    monkeypatch.setattr(suggest_index_module, "insort", insort)
+    monkeypatch.setattr(PrefixIndex, "finish_sorting", finish_sorting)
+    index = SuggestIndex()
+    run(index.build())
+
+    assert len(sorts) == len(index.indexes)
+    assert index.indexes["es"].keys == incremental.keys
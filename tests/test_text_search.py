@@ -0,0 +1,32 @@
+import pytest
+
+from services.article_service import article_service
+from services.database import db_service
+from services.product_service import product_service
+
+
+@pytest.fixture
+def text_queries(monkeypatch, db):
+    """Capture the filters sent to Mongo; the in-memory double has no $text."""
+    queries = []
+
+    async def find_many(collection_name, filter_dict=None, **kwargs):
+        queries.append(filter_dict)
+        return []
+
+    monkeypatch.setattr(db_service, "find_many", find_many)
+    return queries
+
+
+def test_product_text_search_falls_back_to_the_default_language(run, text_queries):
+    page = run(product_service.get_products(search="bambu", language="fr", search_mode="text"))
+
+    assert page.items == []
+    assert text_queries[0]["$text"]["$language"] == "spanish"
+
+
+def test_article_text_search_falls_back_to_the_default_language(run, text_queries):
+    articles = run(article_service.search_articles("bambu", language="fr", mode="text"))
+
+    assert articles == []
+    assert text_queries[0]["$text"]["$language"] == "spanish"